@@ -0,0 +1,54 @@
+"""Measure the throughput of OGame.clone and of the apply/undo move and turn API."""
+import argparse
+import random
+import sys
+import time
+
+from ohanami.game import OGame, OPileView
+from ohanami.players import Centrist
+
+
+def throughput(function, iterations: int) -> float:
+    """Return the number of calls per second of a function."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return iterations / (time.perf_counter() - start)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="clone_undo")
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv[1:])
+
+    game = OGame.create([Centrist() for _ in range(args.players)], seed=args.seed)
+    game.deal_cards()
+    # play a few turns so that piles are not empty
+    for _ in range(3):
+        game.turn()
+    moves = [
+        player.backend.play(
+            list(player.hand), tuple(OPileView(pile) for pile in player.piles), game
+        )
+        for player in game.players
+    ]
+
+    def apply_undo_move() -> None:
+        game.undo_move(game.apply_move(0, moves[0]))
+
+    def apply_undo_turn() -> None:
+        game.undo_turn(game.apply_turn(moves))
+
+    rng = random.Random(args.seed)
+    print(f"clone:           {throughput(game.clone, args.iterations):10.0f} /s")
+    print(
+        f"clone (own rng): {throughput(lambda: game.clone(rng), args.iterations):10.0f} /s"
+    )
+    print(f"apply+undo move: {throughput(apply_undo_move, args.iterations):10.0f} /s")
+    print(f"apply+undo turn: {throughput(apply_undo_turn, args.iterations):10.0f} /s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,107 @@
+"""Measure the throughput of the observation encoder and of the action decoder.
+
+The encoder is compared with a reference writing every feature of every observation
+into the buffer one at a time, which also checks that both agree.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from ohanami.encoding import (
+    FEATURES,
+    SEAT_FEATURES,
+    create_buffer,
+    decode_actions,
+    encode,
+    encode_action,
+)
+from ohanami.game import OGame, derive_seeds
+from ohanami.players import Centrist
+
+
+def encode_reference(games: list[OGame], seats: list[int], out: np.ndarray) -> None:
+    out[: len(games)] = 0
+    for n_game, (game, seat) in enumerate(zip(games, seats)):
+        row = out[n_game]
+        player = game.players[seat]
+        for n_slot, card in enumerate(player.hand):
+            row[FEATURES["hand"].start + card.value - 1] = 1
+            row[FEATURES["slots"].start + n_slot] = card.value
+            row[FEATURES["seen"].start + card.value - 1] = 1
+        for card in player.discarded_cards:
+            row[FEATURES["seen"].start + card.value - 1] = 1
+        for n_seat in range(len(game.players)):
+            other = game.players[(seat + n_seat) % len(game.players)]
+            offset = FEATURES["seats"].start + n_seat * SEAT_FEATURES
+            for pile in other.piles:
+                row[offset] = pile.min
+                row[offset + 1] = pile.max
+                for n_color, count in enumerate(pile.counts.values()):
+                    row[offset + 2 + n_color] = count
+                offset += 6
+                for card in pile.cards:
+                    row[FEATURES["seen"].start + card.value - 1] = 1
+            row[offset] = other.total_score
+            row[offset + 1] = len(other.hand)
+            row[offset + 2] = 1
+        row[FEATURES["season"].start + game.current_season.value] = 1
+        row[FEATURES["turn"].start + game.current_turn - 1] = 1
+
+
+def create_games(count: int, players: int, turns: int, seed: int) -> list[OGame]:
+    """Create games played for some turns, at the beginning of their next turn."""
+    games = []
+    for game_seed in derive_seeds(seed, count):
+        game = OGame.create([Centrist() for _ in range(players)], seed=game_seed)
+        game.output = None
+        game.deal_cards()
+        for _ in range(turns):
+            game.turn()
+        game.begin_turn()
+        games.append(game)
+    return games
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="encoding")
+    parser.add_argument("--games", type=int, default=512, help="Games per batch.")
+    parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument(
+        "--turns", type=int, default=7, help="Turns played before observing."
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv[1:])
+
+    games = create_games(args.games, args.players, args.turns, args.seed)
+    seats = [n_game % args.players for n_game in range(args.games)]
+    hands = [game.players[seat].hand for game, seat in zip(games, seats)]
+    buffer = create_buffer(args.games)
+    reference = create_buffer(args.games)
+    encode_reference(games, seats, reference)
+    if not np.array_equal(encode(games, seats, buffer), reference):
+        raise AssertionError("The encoder and the reference disagree.")
+    moves = [((0, cards[0]), (None, cards[1])) for cards in hands]
+    actions = np.array(
+        [encode_action(move, cards) for move, cards in zip(moves, hands)]
+    )
+
+    for name, function in (
+        ("reference", lambda: encode_reference(games, seats, reference)),
+        ("encode", lambda: encode(games, seats, buffer)),
+        ("decode", lambda: decode_actions(actions, hands)),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            function()
+        elapsed = (time.perf_counter() - start) / args.iterations
+        print(
+            f"{name:10} {1e6 * elapsed / args.games:8.2f} us per observation, "
+            f"{args.games / elapsed:10.0f} per second"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,63 @@
+"""Measure the search rate of the endgame solver and its gain over its fallback.
+
+The solver plays the last seat of games against copies of its fallback, and each
+game is replayed with the fallback in that seat on the same cards, so the gain is
+the mean paired difference of the score of the seat.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from ohanami.game import (
+    OGame,
+    derive_seeds,
+)
+from ohanami.players import (
+    Centrist,
+    EndgameSolver,
+)
+
+
+def play(backends: list, seed: int) -> int:
+    game = OGame.create(backends, seed=seed, shuffle=False)
+    game.output = None
+    game.start()
+    return game.players[-1].score
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="endgame")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--exact-below", type=int, default=4)
+    parser.add_argument("--table-size", type=int, default=1_000_000)
+    args = parser.parse_args(argv[1:])
+
+    solver = EndgameSolver(exact_below=args.exact_below, table_size=args.table_size)
+    differences = []
+    start = time.perf_counter()
+    for seed in derive_seeds(args.seed, args.games):
+        opponents = [Centrist() for _ in range(args.players - 1)]
+        score = play(opponents + [solver], seed)
+        baseline = play(opponents + [Centrist()], seed)
+        differences.append(score - baseline)
+    elapsed = time.perf_counter() - start
+
+    stats = solver.stats
+    print(f"{args.games} games in {elapsed:.1f} s, {stats.searches} searches")
+    print(
+        f"{stats.nodes} nodes in {stats.seconds:.1f} s, "
+        f"{stats.node_rate:,.0f} nodes/s"
+    )
+    print(
+        f"Table: {stats.hit_rate:.1%} hits "
+        f"({stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions)"
+    )
+    se = statistics.stdev(differences) / len(differences) ** 0.5
+    print(f"Gain over Centrist: {statistics.mean(differences):.2f} +- {se:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
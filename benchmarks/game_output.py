@@ -0,0 +1,70 @@
+"""Measure the per-game cost of each output sink of OGame.
+
+The table sink is the behavior of games before sinks were introduced, when every game
+printed its scores table.
+"""
+import argparse
+import os
+import sys
+import time
+
+from ohanami.game import OGame, derive_seeds
+from ohanami.output import OBufferedOutput, OJsonOutput, OOutput, OTableOutput
+from ohanami.players import AlwaysSmall
+
+
+def conclude_cost(game: OGame, output: OOutput | None, iterations: int) -> float:
+    """Return the average time in seconds spent concluding a finished game."""
+    game.output = output
+    start = time.perf_counter()
+    for _ in range(iterations):
+        game.conclude()
+    if output is not None:
+        output.flush()
+    return (time.perf_counter() - start) / iterations
+
+
+def game_cost(seed: int, games: int, players: int, output: OOutput | None) -> float:
+    """Return the average time in seconds spent playing a whole game."""
+    elapsed = 0.0
+    for game_seed in derive_seeds(seed, games):
+        game = OGame.create([AlwaysSmall() for _ in range(players)], seed=game_seed)
+        game.output = output
+        start = time.perf_counter()
+        game.start()
+        elapsed += time.perf_counter() - start
+    if output is not None:
+        output.flush()
+    return elapsed / games
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="game_output")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", default=os.devnull, help="File the sinks write to.")
+    args = parser.parse_args(argv[1:])
+
+    game = OGame.create([AlwaysSmall() for _ in range(args.players)], seed=args.seed)
+    game.output = None
+    game.start()
+    with open(args.stream, "w") as stream:
+        outputs = {
+            "table": OTableOutput(stream),
+            "buffered": OBufferedOutput(stream),
+            "json": OJsonOutput(stream),
+            "none": None,
+        }
+        for name, output in outputs.items():
+            conclude = conclude_cost(game, output, args.iterations)
+            whole = game_cost(args.seed, args.games, args.players, output)
+            print(
+                f"{name:8}: conclude {conclude * 1e6:7.2f} us, "
+                f"game {whole * 1e6:8.1f} us ({1 / whole:6.0f} games/s)"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,166 @@
+"""Compare the shared move index with the per-backend pile loops.
+
+The loops and the index are timed in turns over `--rounds` rounds, keeping the best
+time of each, so that the noise of the machine affects both alike.
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from ohanami.game import OCard, OGame, OPile, OPileView, derive_seeds
+from ohanami.players import BetterBeSafe, Centrist, OBackend
+from ohanami.players.moves import OMoveIndex
+
+
+def closest_piles_loop(cards, piles, game) -> list[int | None]:
+    return [OBackend.get_closest_pile(card, piles) for card in cards]
+
+
+def closest_piles_index(cards, piles, game) -> list[int | None]:
+    index = OMoveIndex(cards, piles)
+    return [index.closest_pile(card.value) for card in cards]
+
+
+class LegacyBetterBeSafe(BetterBeSafe):
+    """BetterBeSafe as implemented with nested cards x piles loops."""
+
+    noob = True
+
+    def play(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
+    ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
+        # first card
+        smallest_distance = 122
+        first_card = None
+        first_pile_i = None
+        for card in cards:
+            for i in range(0, 3):  # loop on the 3 piles
+                if card.value > piles[i].max:
+                    distance = card.value - piles[i].max
+                elif card.value < piles[i].min:
+                    distance = piles[i].min - card.value
+                else:
+                    distance = 122
+                if distance < smallest_distance:
+                    first_card = card
+                    first_pile_i = i
+        if first_pile_i is None:
+            return (
+                (None, cards[0]),
+                (None, cards[1]),
+            )
+        assert first_card is not None
+        piles[first_pile_i].add(first_card)
+
+        # second card, same thing
+        smallest_distance = 122
+        second_card = None
+        second_pile_i = None
+        for card in cards:
+            if card is first_card:
+                continue
+            for i in range(0, 3):
+                if card.value > piles[i].max:
+                    distance = card.value - piles[i].max
+                elif card.value < piles[i].min:
+                    distance = piles[i].min - card.value
+                else:
+                    distance = 122
+                if distance < smallest_distance:
+                    second_card = card
+                    second_pile_i = i
+
+        if second_card is None:
+            second_card = next(card for card in cards if card is not first_card)
+        # return the two selected cards
+        return (
+            (first_pile_i, first_card),
+            (second_pile_i, second_card),
+        )
+
+
+class IndexedCentrist(Centrist):
+    """Centrist as implemented with a move index, slower than its pile loops."""
+
+    def play(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
+    ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
+        cards = [card for card in sorted(cards, key=lambda card: abs(card.value - 60))]
+        index = OMoveIndex(cards, piles)
+        selected_cards: list[tuple[int | None, OCard]] = []
+        for card in cards:
+            best_pile = index.closest_pile(card.value)
+            if best_pile is not None:
+                selected_cards.append((best_pile, card))
+                if len(selected_cards) == 2:
+                    return (selected_cards[0], selected_cards[1])
+                index.place(card.value, best_pile)
+        while len(selected_cards) != 2:
+            selected_cards.append(
+                (
+                    None,
+                    next(
+                        card
+                        for card in cards
+                        if not any(
+                            selected_card is card
+                            for selected_pile, selected_card in selected_cards
+                        )
+                    ),
+                )
+            )
+        return (selected_cards[0], selected_cards[1])
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="move_index")
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv[1:])
+
+    # gather positions met during Centrist games
+    positions = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for game_seed in derive_seeds(args.seed, args.positions):
+            if len(positions) >= args.positions:
+                break
+            game = OGame.create([Centrist() for _ in range(4)], seed=game_seed)
+            game.deal_cards()
+            while not game.finished:
+                positions += [
+                    (
+                        list(player.hand),
+                        tuple(pile.copy() for pile in player.piles),
+                    )
+                    for player in game.players
+                ]
+                game.turn()
+
+    for name, loop, index in (
+        ("closest piles", closest_piles_loop, closest_piles_index),
+        ("BetterBeSafe.play", LegacyBetterBeSafe().play, BetterBeSafe().play),
+        ("Centrist.play", Centrist().play, IndexedCentrist().play),
+    ):
+        timings = [float("inf"), float("inf")]
+        for _ in range(args.rounds):
+            for n_function, function in enumerate((loop, index)):
+                start = time.perf_counter()
+                for _ in range(args.repeats):
+                    for cards, piles in positions:
+                        function(cards, tuple(OPileView(pile) for pile in piles), None)
+                timings[n_function] = min(
+                    timings[n_function],
+                    (time.perf_counter() - start) / (args.repeats * len(positions)),
+                )
+        print(
+            f"{name}: loops {timings[0] * 1e6:.2f} us, index {timings[1] * 1e6:.2f} us"
+            f" (x{timings[0] / timings[1]:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,65 @@
+"""Compare the copy-on-write pile views with the former deepcopy of the piles."""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from copy import deepcopy
+
+from ohanami.game import OGame, OPlayer, derive_seeds
+from ohanami.players import AlwaysSmall, BetterBeSafe, Centrist, RandomRetardPlayer
+
+HEURISTICS = [RandomRetardPlayer, AlwaysSmall, BetterBeSafe, Centrist]
+
+
+class DeepcopyPlayer(OPlayer):
+    """Player handing a deep copy of its piles to its backend, as done previously."""
+
+    def play(self, game: "OGame") -> None:
+        played_cards = self.backend.play(list(self.hand), deepcopy(self.piles), game)
+        for npile, played_card in played_cards:
+            card = next(card for card in self.hand if card.value == played_card.value)
+            self.hand.remove(card)
+            if npile is None:
+                self.discarded_cards.append(card)
+                continue
+            pile = self.piles[npile]
+            if not pile.add(card, backend=self.backend):
+                self.discarded_cards.append(card)
+
+
+def time_games(games: int, players: int, deepcopy_piles: bool, seed: int) -> float:
+    """Return the average time of a game, in seconds."""
+    elapsed = 0.0
+    for game_seed in derive_seeds(seed, games):
+        game = OGame.create(
+            [None for _ in range(players)], seed=game_seed, available=HEURISTICS
+        )
+        if deepcopy_piles:
+            game.players = [
+                DeepcopyPlayer(player.backend, player.name) for player in game.players
+            ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            game.start()
+            elapsed += time.perf_counter() - start
+    return elapsed / games
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="pile_views")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv[1:])
+
+    deepcopy_time = time_games(args.games, args.players, True, args.seed)
+    view_time = time_games(args.games, args.players, False, args.seed)
+    print(f"deepcopy: {deepcopy_time * 1e3:.3f} ms/game")
+    print(f"views:    {view_time * 1e3:.3f} ms/game")
+    print(f"speedup:  x{deepcopy_time / view_time:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,80 @@
+"""Measure the import time of the modules of headless runs, with -X importtime.
+
+Each module is imported in fresh interpreters, and the median cumulative import time
+is reported along with the slowest modules it imports. The run fails if
+`ohanami.game` loads one of the modules only needed by interactive, asynchronous or
+multiprocess runs, or if its import time exceeds --max-ms.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = ["ohanami.game", "ohanami.tournament", "ohanami.selfplay"]
+# Modules headless games do not need, loaded on demand only
+FORBIDDEN = [
+    "curses",
+    "matplotlib",
+    "asyncio",
+    "multiprocessing",
+    "concurrent.futures",
+    "numpy",
+]
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Import a module in a new interpreter, returning the self and cumulative time
+    in microseconds of every module it imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="startup")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest modules shown.")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if importing ohanami.game takes longer, in milliseconds.",
+    )
+    args = parser.parse_args(argv[1:])
+
+    failures = []
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.runs)]
+        cumulative = statistics.median(times[module][1] for times in runs) / 1000
+        print(f"{module}: {cumulative:.1f} ms")
+        slowest = sorted(runs[-1].items(), key=lambda item: -item[1][0])
+        for name, (self_us, _) in slowest[: args.top]:
+            print(f"    {name:40} {self_us / 1000:6.1f} ms")
+        if module != "ohanami.game":
+            continue
+        loaded = [name for name in FORBIDDEN if name in runs[-1]]
+        if loaded:
+            failures.append(f"{module} loads {', '.join(loaded)}")
+        if args.max_ms is not None and cumulative > args.max_ms:
+            failures.append(f"{module} takes {cumulative:.1f} ms to import")
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
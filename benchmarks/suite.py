@@ -0,0 +1,292 @@
+"""Benchmark suite of the engine, the backends and the tournaments.
+
+Four sections are measured, each can be selected with --sections:
+
+- throughput: games per second of every combination of backends, at 3 and 4 seats,
+- latency: percentiles of the time spent in `OBackend.play`, per backend,
+- memory: blocks allocated by a game and its peak memory per backend, with
+  `tracemalloc`,
+- scaling: games per second of `ohanami.tournament.run` per number of workers.
+
+Results are written as JSON, to `benchmarks/benchmark.json` by default, and can be
+compared with those of a former run with --compare.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from typing import Callable
+
+import numpy as np
+
+from ohanami import tournament
+from ohanami.game import OGame, derive_seeds
+from ohanami.players import AVAILABLE_PLAYERS, MonteCarlo, OBackend
+
+SECTIONS = ["throughput", "latency", "memory", "scaling"]
+
+
+def get_factories(
+    names: list[str] | None, rollouts: int
+) -> dict[str, Callable[[], OBackend]]:
+    """Get the backend constructors by name, MonteCarlo using `rollouts`."""
+    return {
+        backend.__name__: (
+            (lambda: MonteCarlo(rollouts=rollouts))
+            if backend is MonteCarlo
+            else backend
+        )
+        for backend in AVAILABLE_PLAYERS
+        if names is None or backend.__name__ in names
+    }
+
+
+def create_game(backends: list[OBackend], seed: int) -> OGame:
+    game = OGame.create(backends, seed=seed)
+    game.output = None
+    return game
+
+
+def bench_throughput(
+    factories: dict[str, Callable[[], OBackend]], games: int, seed: int
+) -> list[dict]:
+    results = []
+    for players in (3, 4):
+        for names in itertools.combinations_with_replacement(factories, players):
+            elapsed = 0.0
+            for game_seed in derive_seeds(seed, games):
+                game = create_game([factories[name]() for name in names], game_seed)
+                start = time.perf_counter()
+                game.start()
+                elapsed += time.perf_counter() - start
+                game.close()
+            results.append(
+                {
+                    "players": players,
+                    "backends": list(names),
+                    "games_per_s": games / elapsed,
+                }
+            )
+            print(f"{players} seats {', '.join(names)}: {games / elapsed:.1f} games/s")
+    return results
+
+
+def bench_latency(
+    factories: dict[str, Callable[[], OBackend]], games: int, seed: int
+) -> list[dict]:
+    results = []
+    for name, factory in factories.items():
+        latencies: list[int] = []
+        for game_seed in derive_seeds(seed, games):
+            game = create_game([factory() for _ in range(4)], game_seed)
+            for player in game.players:
+                play = player.backend.play
+
+                # timing on the instance keeps the backend of the player
+                def timed_play(*args, play=play):
+                    start = time.perf_counter_ns()
+                    move = play(*args)
+                    latencies.append(time.perf_counter_ns() - start)
+                    return move
+
+                player.backend.play = timed_play  # type: ignore[method-assign]
+            game.start()
+            game.close()
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) / 1000
+        results.append(
+            {
+                "backend": name,
+                "moves": len(latencies),
+                "p50_us": p50,
+                "p90_us": p90,
+                "p99_us": p99,
+                "max_us": max(latencies) / 1000,
+            }
+        )
+        print(f"{name}: p50 {p50:.1f} us, p90 {p90:.1f} us, p99 {p99:.1f} us")
+    return results
+
+
+def get_allocations(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+) -> tuple[int, int]:
+    """Count the blocks and bytes allocated between two snapshots and still alive."""
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignored).compare_to(
+        before.filter_traces(ignored), "traceback"
+    )
+    blocks = sizes = 0
+    for stat in diff:
+        if stat.count_diff > 0:
+            blocks += stat.count_diff
+            sizes += max(0, stat.size_diff)
+    return blocks, sizes
+
+
+def bench_memory(
+    factories: dict[str, Callable[[], OBackend]], games: int, seed: int
+) -> list[dict]:
+    """Count the allocations of games between 4 players of each backend.
+
+    `tracemalloc` only tracks live memory blocks, so the memory is snapshot after
+    each turn, and the blocks allocated per game are those each turn allocated and
+    still holds at its end. Blocks freed within the turn that allocated them are
+    not counted. The peak memory reached while playing the game is reported too.
+    """
+    results = []
+    for name, factory in factories.items():
+        peaks, blocks, sizes = [], [], []
+        for game_seed in derive_seeds(seed, games):
+            game = create_game([factory() for _ in range(4)], game_seed)
+            game_blocks = game_sizes = 0
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            game.deal_cards()
+            while not game.finished:
+                game.turn()
+                after = tracemalloc.take_snapshot()
+                turn_blocks, turn_sizes = get_allocations(before, after)
+                game_blocks += turn_blocks
+                game_sizes += turn_sizes
+                before = after
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            game.close()
+            blocks.append(game_blocks)
+            sizes.append(game_sizes)
+        results.append(
+            {
+                "backend": name,
+                "peak_bytes": float(np.mean(peaks)),
+                "allocated_blocks": float(np.mean(blocks)),
+                "allocated_bytes": float(np.mean(sizes)),
+            }
+        )
+        print(
+            f"{name}: {np.mean(blocks):.0f} blocks allocated per game, "
+            f"peak {np.mean(peaks) / 1024:.1f} KiB"
+        )
+    return results
+
+
+def bench_scaling(
+    names: list[str] | None, games: int, seed: int, workers: list[int]
+) -> list[dict]:
+    """Measure tournaments between the backends, MonteCarlo excepted."""
+    backends = [
+        backend
+        for backend in AVAILABLE_PLAYERS
+        if backend is not MonteCarlo and (names is None or backend.__name__ in names)
+    ]
+    results = []
+    for n_workers in workers:
+        start = time.perf_counter()
+        tournament.run(
+            games,
+            4,
+            seed=seed,
+            workers=n_workers,
+            shard_size=max(1, games // (4 * n_workers)),
+            backends=backends,
+        )
+        rate = games / (time.perf_counter() - start)
+        results.append({"workers": n_workers, "games_per_s": rate})
+        print(f"{n_workers} workers: {rate:.1f} games/s")
+    return results
+
+
+def get_metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, reference: dict) -> None:
+    """Print the ratio of each rate of a run to the one of a reference run."""
+    keys = {
+        "throughput": lambda entry: (entry["players"], tuple(entry["backends"])),
+        "latency": lambda entry: entry["backend"],
+        "scaling": lambda entry: entry["workers"],
+    }
+    fields = {
+        "throughput": "games_per_s",
+        "latency": "p50_us",
+        "scaling": "games_per_s",
+    }
+    for section, key in keys.items():
+        former = {key(entry): entry for entry in reference.get(section, [])}
+        for entry in results.get(section, []):
+            if key(entry) not in former:
+                continue
+            ratio = entry[fields[section]] / former[key(entry)][fields[section]]
+            print(f"{section} {key(entry)}: {fields[section]} x{ratio:.2f}")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="suite")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=SECTIONS)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend.__name__ for backend in AVAILABLE_PLAYERS],
+        default=None,
+    )
+    parser.add_argument("--games", type=int, default=20, help="Games per measure.")
+    parser.add_argument(
+        "--rollouts", type=int, default=8, help="Rollouts per MonteCarlo move."
+    )
+    parser.add_argument("--scaling-games", type=int, default=4000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=None, help="Defaults to 1, 2, 4..."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", default=os.path.join(os.path.dirname(__file__), "benchmark.json")
+    )
+    parser.add_argument("--compare", default=None, help="JSON results of a former run.")
+    args = parser.parse_args(argv[1:])
+
+    factories = get_factories(args.backends, args.rollouts)
+    workers = args.workers or [
+        2**power for power in range((os.cpu_count() or 1).bit_length())
+    ]
+    results: dict = {"meta": get_metadata()}
+    results["meta"]["args"] = vars(args)
+    if "throughput" in args.sections:
+        results["throughput"] = bench_throughput(factories, args.games, args.seed)
+    if "latency" in args.sections:
+        results["latency"] = bench_latency(factories, args.games, args.seed)
+    if "memory" in args.sections:
+        results["memory"] = bench_memory(factories, args.games, args.seed)
+    if "scaling" in args.sections:
+        results["scaling"] = bench_scaling(
+            args.backends, args.scaling_games, args.seed, workers
+        )
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,425 @@
+"""Vectorized batch engine playing many Ohanami games at once with NumPy.
+
+Every array has the batch axis first, then the seat axis. Cards are stored as their
+values, 0 marking an empty hand slot. Hand slots keep the order in which the cards
+were dealt, so that policies depending on the hand order behave like their
+`OBackend` counterpart.
+"""
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Callable
+
+import numpy as np
+
+from ohanami.compact import (
+    CARD_COLORS,
+    create_compact_deck,
+)
+from ohanami.game import (
+    OCard,
+    OGame,
+    OPile,
+    OSeason,
+)
+from ohanami.players import (
+    AlwaysSmall,
+    BetterBeSafe,
+    Centrist,
+    OBackend,
+    RandomRetardPlayer,
+)
+from ohanami.stats import OScoreStats
+
+# A policy receives hands (M, 10) and pile mins and maxs (M, 3), and returns the
+# hand slots (M, 2) of the two cards played and their piles (M, 2), -1 for a discard.
+BatchPolicy = Callable[
+    [np.ndarray, np.ndarray, np.ndarray, np.random.Generator],
+    tuple[np.ndarray, np.ndarray],
+]
+
+COLORS_TABLE = np.frombuffer(CARD_COLORS, dtype=np.uint8).astype(np.intp)
+NO_GAP = 122
+
+
+def create_decks(games: int, rng: np.random.Generator) -> np.ndarray:
+    """Create one shuffled deck per game, as an array of shape (games, 120)."""
+    deck = np.array(create_compact_deck(), dtype=np.int16)
+    return rng.permuted(np.tile(deck, (games, 1)), axis=1)
+
+
+def _add(
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    mask: np.ndarray,
+    piles: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    """Place in-place the values on the piles of the masked rows, assuming they fit."""
+    rows = np.flatnonzero(mask)
+    piles, values = piles[mask], values[mask]
+    mins[rows, piles] = np.minimum(mins[rows, piles], values)
+    maxs[rows, piles] = np.maximum(maxs[rows, piles], values)
+
+
+def _first_slots(hands: np.ndarray, count: int) -> np.ndarray:
+    """Get the first non-empty slots of each hand, in hand order."""
+    return np.argsort(hands == 0, axis=1, kind="stable")[:, :count]
+
+
+def always_small(
+    hands: np.ndarray, mins: np.ndarray, maxs: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `AlwaysSmall` policy."""
+    rows = np.arange(hands.shape[0])
+    order = np.argsort(np.where(hands > 0, hands, 999), axis=1, kind="stable")
+    slots = np.stack((order[:, 1], order[:, 0]), axis=1)
+    piles = np.empty_like(slots)
+    mins = mins.copy()
+    for n_card in range(2):
+        values = hands[rows, slots[:, n_card]]
+        gaps = np.where(mins > values[:, None], mins - values[:, None], NO_GAP)
+        piles[:, n_card] = gaps.argmin(axis=1)
+        placed = gaps[rows, piles[:, n_card]] < NO_GAP
+        mins[rows[placed], piles[placed, n_card]] = values[placed]
+    return slots, piles
+
+
+def better_be_safe(
+    hands: np.ndarray, mins: np.ndarray, maxs: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `BetterBeSafe` policy: last admissible card and pile in hand order."""
+    rows = np.arange(hands.shape[0])
+    nslots = hands.shape[1]
+    mins, maxs = mins.copy(), maxs.copy()
+    first_slots = _first_slots(hands, 2)
+    slots = first_slots.copy()
+    piles = np.full_like(slots, -1)
+    values = hands[:, :, None]
+    for n_card in range(2):
+        admissible = (values > 0) & (
+            (values > maxs[:, None, :]) | (values < mins[:, None, :])
+        )
+        if n_card:
+            admissible[rows, slots[:, 0]] = False
+        card_admissible = admissible.any(axis=2)
+        found = card_admissible.any(axis=1)
+        if n_card:
+            # without a second admissible card, discard the first remaining one
+            found &= piles[:, 0] >= 0
+            slots[:, 1] = np.where(
+                first_slots[:, 0] == slots[:, 0], first_slots[:, 1], first_slots[:, 0]
+            )
+        last_slot = nslots - 1 - card_admissible[:, ::-1].argmax(axis=1)
+        last_pile = 2 - admissible[rows, last_slot, ::-1].argmax(axis=1)
+        slots[found, n_card] = last_slot[found]
+        piles[found, n_card] = last_pile[found]
+        if not n_card:
+            _add(mins, maxs, found, last_pile, hands[rows, last_slot])
+    return slots, piles
+
+
+def centrist(
+    hands: np.ndarray, mins: np.ndarray, maxs: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `Centrist` policy: centermost cards on their closest piles."""
+    rows = np.arange(hands.shape[0])
+    nslots = hands.shape[1]
+    key = np.where(hands > 0, np.abs(hands - 60) * nslots + np.arange(nslots), 1 << 14)
+    order = np.argsort(key, axis=1)
+    mins, maxs = mins.copy(), maxs.copy()
+    slots = order[:, :2].copy()
+    piles = np.full_like(slots, -1)
+    values = hands[rows[:, None], order][:, :, None]
+    for n_card in range(2):
+        empty = maxs == 0
+        gaps = np.where(
+            values < mins[:, None, :],
+            mins[:, None, :] - values,
+            np.where(values > maxs[:, None, :], values - maxs[:, None, :], NO_GAP),
+        )
+        closest = np.where(
+            empty.any(axis=1)[:, None],
+            empty.argmax(axis=1)[:, None],
+            gaps.argmin(axis=2),
+        )
+        admissible = (values[:, :, 0] > 0) & (
+            empty.any(axis=1)[:, None] | (gaps.min(axis=2) < NO_GAP)
+        )
+        if n_card:
+            admissible[rows, first_rank] = False
+        rank = admissible.argmax(axis=1)
+        found = admissible.any(axis=1)
+        if n_card:
+            # without a second admissible card, discard the centermost remaining one
+            found &= piles[:, 0] >= 0
+            slots[:, 1] = np.where(first_rank == 0, order[:, 1], order[:, 0])
+        else:
+            first_rank = rank
+        slots[found, n_card] = order[rows, rank][found]
+        piles[found, n_card] = closest[rows, rank][found]
+        if not n_card:
+            _add(mins, maxs, found, piles[:, 0], values[rows, rank, 0])
+    return slots, piles
+
+
+def random_retard(
+    hands: np.ndarray, mins: np.ndarray, maxs: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `RandomRetardPlayer` policy: two random cards on random piles."""
+    rows = np.arange(hands.shape[0])
+    draws = np.where(hands > 0, rng.random(hands.shape), -1.0)
+    first_slot = draws.argmax(axis=1)
+    draws[rows, first_slot] = -1.0
+    slots = np.stack((first_slot, draws.argmax(axis=1)), axis=1)
+    return slots, rng.integers(0, 3, size=slots.shape)
+
+
+class ORowGenerators:
+    """Generators of the rows of a batch, for the random policies.
+
+    Each row draws its random numbers from its own generator, seeded by its game, so
+    that its moves do not depend on the other rows of the batch. Generators are only
+    created if the policy draws.
+    """
+
+    def __init__(self, seeds: list[int]) -> None:
+        self.seeds = seeds
+        self._generators: list[np.random.Generator] | None = None
+
+    @property
+    def generators(self) -> list[np.random.Generator]:
+        if self._generators is None:
+            self._generators = [np.random.default_rng(seed) for seed in self.seeds]
+        return self._generators
+
+    def random(self, size: tuple[int, ...]) -> np.ndarray:
+        return np.stack([generator.random(size[1:]) for generator in self.generators])
+
+    def integers(self, low: int, high: int, size: tuple[int, ...]) -> np.ndarray:
+        return np.stack(
+            [
+                generator.integers(low, high, size=size[1:])
+                for generator in self.generators
+            ]
+        )
+
+
+class OPolicyBackend(OBackend):
+    """Backend deciding the moves of many players at once with a batch policy.
+
+    Moves are decided by one vectorized call to `policy` per batch, see
+    `OBackend.play_batch`. Random policies draw each row from a generator seeded by
+    its game, see `ORowGenerators`, so that moves only depend on their game.
+    """
+
+    noob = True
+    policy: BatchPolicy
+
+    def play(
+        self, cards: list[OCard], piles: tuple[OPile, OPile, OPile], game: OGame
+    ) -> tuple[tuple[int | None, OCard], tuple[int | None, OCard]]:
+        return self.play_batch([cards], [piles], [game])[0]
+
+    def play_batch(
+        self,
+        hands: list[list[OCard]],
+        piles: list[tuple[OPile, OPile, OPile]],
+        games: list[OGame],
+    ) -> list[tuple[tuple[int | None, OCard], tuple[int | None, OCard]]]:
+        values = np.zeros((len(hands), 10), dtype=np.int16)
+        for n_hand, cards in enumerate(hands):
+            values[n_hand, : len(cards)] = [card.value for card in cards]
+        mins = np.array(
+            [[pile.min for pile in player_piles] for player_piles in piles],
+            dtype=np.int16,
+        )
+        maxs = np.array(
+            [[pile.max for pile in player_piles] for player_piles in piles],
+            dtype=np.int16,
+        )
+        # each game draws its seed as when played alone
+        generators = ORowGenerators([game.rng.getrandbits(64) for game in games])
+        slots, chosen = type(self).policy(
+            values, mins, maxs, generators  # type: ignore[arg-type]
+        )
+        return [
+            (
+                (None if first_pile < 0 else int(first_pile), cards[first_slot]),
+                (None if second_pile < 0 else int(second_pile), cards[second_slot]),
+            )
+            for cards, (first_slot, second_slot), (first_pile, second_pile) in zip(
+                hands, slots.tolist(), chosen.tolist()
+            )
+        ]
+
+
+class VectorAlwaysSmall(OPolicyBackend):
+    """`AlwaysSmall` deciding its moves in batches."""
+
+    policy = staticmethod(always_small)
+
+
+class VectorBetterBeSafe(OPolicyBackend):
+    """`BetterBeSafe` deciding its moves in batches."""
+
+    policy = staticmethod(better_be_safe)
+
+
+class VectorCentrist(OPolicyBackend):
+    """`Centrist` deciding its moves in batches."""
+
+    policy = staticmethod(centrist)
+
+
+BATCH_POLICIES: dict[type[OBackend], BatchPolicy] = {
+    RandomRetardPlayer: random_retard,
+    AlwaysSmall: always_small,
+    BetterBeSafe: better_be_safe,
+    Centrist: centrist,
+}
+
+
+@dataclass
+class OBatch:
+    """Batch of Ohanami games played simultaneously.
+
+    Attributes:
+        seats: Index in `backends` of the backend of each seat, of shape (games, players).
+        decks: Shuffled deck of each game, of shape (games, 120).
+        backends: Backends classes having a batch policy.
+        rng: Generator used by the random policies.
+    """
+
+    seats: np.ndarray
+    decks: np.ndarray
+    backends: list[type[OBackend]] = field(default_factory=lambda: list(BATCH_POLICIES))
+    rng: np.random.Generator = field(default_factory=np.random.default_rng)
+    finished: bool = False
+    current_turn: int = 0
+    current_season: OSeason = OSeason.FIRST
+
+    def __post_init__(self) -> None:
+        games, players = self.seats.shape
+        self.hands = np.zeros((games, players, 10), dtype=np.int16)
+        self.mins = np.full((games, players, 3), 121, dtype=np.int16)
+        self.maxs = np.zeros((games, players, 3), dtype=np.int16)
+        self.counts = np.zeros((games, players, 3, 4), dtype=np.int16)
+        self.discarded = np.zeros((games, players), dtype=np.int16)
+        self.scores = np.zeros((games, players, 3, 4), dtype=np.int32)
+        self.groups = [
+            [
+                (
+                    BATCH_POLICIES[backend],
+                    np.flatnonzero(self.seats[:, seat] == n_backend),
+                )
+                for n_backend, backend in enumerate(self.backends)
+            ]
+            for seat in range(players)
+        ]
+
+    @classmethod
+    def create(
+        cls,
+        games: int,
+        players: int,
+        rng: np.random.Generator,
+        backends: list[type[OBackend]] | None = None,
+    ) -> "OBatch":
+        """Create a batch of games with random seatings and decks."""
+        backends = list(BATCH_POLICIES) if backends is None else backends
+        return cls(
+            rng.integers(0, len(backends), size=(games, players)),
+            create_decks(games, rng),
+            backends,
+            rng,
+        )
+
+    @property
+    def score(self) -> np.ndarray:
+        """Total score of each seat, of shape (games, players)."""
+        return self.scores.sum(axis=(2, 3))
+
+    def deal_cards(self) -> None:
+        games, players, _ = self.hands.shape
+        offset = 10 * players * self.current_season.value
+        self.hands[:] = self.decks[:, offset : offset + 10 * players].reshape(
+            games, players, 10
+        )
+
+    def start(self) -> None:
+        self.deal_cards()
+        while not self.finished:
+            self.turn()
+
+    def turn(self) -> None:
+        """Run a complete turn for all the games."""
+        self.current_turn += 1
+        for seat, groups in enumerate(self.groups):
+            for policy, games in groups:
+                if not games.size:
+                    continue
+                slots, piles = policy(
+                    self.hands[games, seat],
+                    self.mins[games, seat],
+                    self.maxs[games, seat],
+                    self.rng,
+                )
+                self.play(games, seat, slots, piles)
+        shift = -1 if self.current_season is OSeason.SECOND else 1
+        self.hands = np.roll(self.hands, shift, axis=1)
+        if self.current_turn == 5:
+            self.go_next_season()
+
+    def play(
+        self, games: np.ndarray, seat: int, slots: np.ndarray, piles: np.ndarray
+    ) -> None:
+        """Play the selected cards of a seat, discarding the ones not fitting their pile."""
+        for n_card in range(2):
+            slot, pile = slots[:, n_card], piles[:, n_card]
+            values = self.hands[games, seat, slot]
+            self.hands[games, seat, slot] = 0
+            mins = self.mins[games, seat, pile]
+            maxs = self.maxs[games, seat, pile]
+            placed = (pile >= 0) & ((values < mins) | (values > maxs))
+            placed_games, pile, values = games[placed], pile[placed], values[placed]
+            self.mins[placed_games, seat, pile] = np.minimum(mins[placed], values)
+            self.maxs[placed_games, seat, pile] = np.maximum(maxs[placed], values)
+            self.counts[placed_games, seat, pile, COLORS_TABLE[values]] += 1
+            self.discarded[games[~placed], seat] += 1
+
+    def go_next_season(self) -> None:
+        season = self.current_season.value
+        counts = self.counts.sum(axis=2, dtype=np.int32)
+        scores = self.scores[:, :, season]
+        scores[..., 0] = 3 * counts[..., 0]
+        if season >= OSeason.SECOND.value:
+            scores[..., 1] = 4 * counts[..., 1]
+        if season == OSeason.THIRD.value:
+            scores[..., 2] = 7 * counts[..., 2]
+            sakura = self.counts[..., 3].astype(np.int32)
+            scores[..., 3] = (sakura * (sakura + 1) // 2).sum(axis=2)
+        self.current_turn = 0
+        if self.current_season is OSeason.THIRD:
+            self.finished = True
+            return
+        self.current_season = OSeason(season + 1)
+        self.deal_cards()
+
+
+def run_tournament(
+    games: int,
+    players: int,
+    rng: np.random.Generator,
+    batch_size: int = 100_000,
+    backends: list[type[OBackend]] | None = None,
+) -> OScoreStats:
+    """Play games by batches and gather the statistics of each backend."""
+    backends = list(BATCH_POLICIES) if backends is None else backends
+    stats = OScoreStats()
+    for start in range(0, games, batch_size):
+        batch = OBatch.create(min(batch_size, games - start), players, rng, backends)
+        batch.start()
+        stats.add_batch(batch.seats, batch.score, backends)
+    return stats
@@ -0,0 +1,281 @@
+"""Time budgets of the backends moves.
+
+Games given a budget, see `OGame.budget`, run the moves of their backends in a worker
+thread or process and wait for them at most the time left to the backend. A backend
+overrunning its budget gets a fallback move instead, and the overruns are counted per
+backend.
+
+A thread cannot be interrupted, so a backend overrunning in a thread keeps running in
+the background, on its own copy of the game seeded by the game generator, and its late
+move is ignored. The thread then exits, and while `max_detached` of them are still
+running, the moves of the backends are played by the fallback without being asked. A
+process is terminated instead, but the game and the backend are sent to it on every
+move, and the changes the backend makes to its own state are lost.
+"""
+import queue
+import random
+import threading
+import time
+
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+)
+
+from ohanami.players import OBackend
+
+if TYPE_CHECKING:
+    import multiprocessing.pool
+
+    from ohanami.game import OCard, OGame, OPile, OPlayer
+
+Move = tuple[tuple[int | None, "OCard"], tuple[int | None, "OCard"]]
+
+
+@dataclass
+class OOverruns:
+    """Number of moves of a backend, and of those replaced by the fallback."""
+
+    moves: int = 0
+    # Moves exceeding the time left to the backend
+    timeouts: int = 0
+    # Moves not even asked to the backend, its game budget being spent
+    exhausted: int = 0
+    # Moves not asked to the backend, too many overrunning moves still running
+    blocked: int = 0
+
+    def merge(self, other: "OOverruns") -> None:
+        self.moves += other.moves
+        self.timeouts += other.timeouts
+        self.exhausted += other.exhausted
+        self.blocked += other.blocked
+
+
+class OMoveThread:
+    """Daemon thread running moves one at a time, abandoned when a move overruns."""
+
+    def __init__(self) -> None:
+        self.requests: queue.SimpleQueue = queue.SimpleQueue()
+        self.results: queue.SimpleQueue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            function, args = request
+            try:
+                self.results.put((True, function(*args)))
+            except BaseException as error:
+                self.results.put((False, error))
+
+    def call(self, timeout: float, function: Callable[..., Any], *args: Any) -> Any:
+        """Call a function in the thread, raising TimeoutError if it overruns."""
+        self.requests.put((function, args))
+        try:
+            success, result = self.results.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError
+        if not success:
+            raise result
+        return result
+
+    def stop(self) -> None:
+        """Let the thread exit once its current call returns."""
+        self.requests.put(None)
+
+
+def copy_move_state(
+    player: "OPlayer", cards: "list[OCard]"
+) -> "tuple[list[OCard], tuple[OPile, OPile, OPile]]":
+    """Get a copy of the hand and fresh views of the piles of a player."""
+    from ohanami.game import OPileView
+
+    return list(cards), (
+        OPileView(player.piles[0]),
+        OPileView(player.piles[1]),
+        OPileView(player.piles[2]),
+    )
+
+
+def play_isolated(
+    backend: OBackend,
+    cards: "list[OCard]",
+    piles: "tuple[OPile, OPile, OPile]",
+    game: "OGame",
+) -> Move:
+    return backend.play(cards, piles, game)
+
+
+@dataclass
+class OBudget:
+    """Time budgets of the backends, with the overruns of each backend.
+
+    Args:
+        move_ms: Time allowed per move in milliseconds, unlimited if None.
+        game_ms: Time allowed per player over a whole game in milliseconds,
+                 unlimited if None.
+        fallback: Backend playing the overrun moves. If None, the first two cards of
+                  the hand are discarded.
+        isolation: Run the moves in a "thread" or in a "process".
+        max_detached: Number of abandoned threads still running from which the
+                      moves are played by the fallback.
+    """
+
+    move_ms: float | None = None
+    game_ms: float | None = None
+    fallback: type[OBackend] | None = None
+    isolation: str = "thread"
+    max_detached: int = 4
+    overruns: dict[type[OBackend], OOverruns] = field(default_factory=dict)
+    _fallback: OBackend | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _thread: OMoveThread | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _pool: "multiprocessing.pool.Pool | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Threads abandoned by overrunning moves
+    _detached: list[OMoveThread] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.isolation not in ("thread", "process"):
+            raise ValueError(f"Unknown isolation {self.isolation}.")
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_thread"] = None
+        state["_pool"] = None
+        state["_detached"] = []
+        return state
+
+    def play(
+        self,
+        player: "OPlayer",
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> Move:
+        """Get the move of a player within its budget, or the fallback move."""
+        overruns = self.overruns.setdefault(player.backend.__class__, OOverruns())
+        overruns.moves += 1
+        timeout = self.move_ms
+        if self.game_ms is not None:
+            left = self.game_ms - 1000 * player.time_spent
+            if left <= 0:
+                overruns.exhausted += 1
+                return self.play_fallback(cards, piles, game)
+            timeout = left if timeout is None else min(timeout, left)
+        if timeout is None:
+            return player.backend.play(cards, piles, game)
+        start = time.perf_counter()
+        try:
+            if self.isolation == "thread":
+                return self.play_thread(timeout, overruns, player, cards, game)
+            return self.play_process(timeout, player, cards, piles, game)
+        except TimeoutError:
+            overruns.timeouts += 1
+            if self._pool is not None:
+                self._pool.terminate()
+            if self._thread is not None:
+                self._thread.stop()
+                self._detached.append(self._thread)
+            self._thread = None
+            self._pool = None
+            return self.play_fallback(*copy_move_state(player, cards), game)
+        finally:
+            player.time_spent += time.perf_counter() - start
+
+    def play_thread(
+        self,
+        timeout: float,
+        overruns: OOverruns,
+        player: "OPlayer",
+        cards: "list[OCard]",
+        game: "OGame",
+    ) -> Move:
+        """Get a move from the worker thread, raising TimeoutError if it overruns."""
+        self._detached = [
+            thread for thread in self._detached if thread.thread.is_alive()
+        ]
+        if len(self._detached) >= self.max_detached:
+            overruns.blocked += 1
+            return self.play_fallback(*copy_move_state(player, cards), game)
+        if self._thread is None:
+            self._thread = OMoveThread()
+        # an abandoned move keeps running, so it is given its own game, which
+        # nothing else reads, drawing from its own generator
+        clone = game.clone(random.Random(game.rng.getrandbits(64)))
+        own = clone.players[game.players.index(player)]
+        return self._thread.call(
+            timeout / 1000, player.backend.play, list(cards), own.piles, clone
+        )
+
+    def play_process(
+        self,
+        timeout: float,
+        player: "OPlayer",
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> Move:
+        """Get a move from the worker process, raising TimeoutError if it overruns."""
+        # multiprocessing is only loaded by games isolating their moves in a process
+        import multiprocessing
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(1)
+        # sent together so that the backend is still the one of its player
+        try:
+            return self._pool.apply_async(
+                play_isolated, (player.backend, cards, piles, game.clone())
+            ).get(timeout / 1000)
+        except multiprocessing.TimeoutError:
+            raise TimeoutError
+
+    def play_fallback(
+        self,
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> Move:
+        if self.fallback is None:
+            return ((None, cards[0]), (None, cards[1]))
+        if self._fallback is None:
+            self._fallback = self.fallback()
+        move = self._fallback.play(cards, piles, game)
+        if not self._fallback.noob:
+            return move
+        # the game checks moves against the backend of the player, which may not
+        # allow invalid placements, so those of the fallback become discards
+        mins, maxs = [pile.min for pile in piles], [pile.max for pile in piles]
+        checked = []
+        for npile, card in move:
+            if npile is not None:
+                if mins[npile] < card.value < maxs[npile]:
+                    npile = None
+                else:
+                    mins[npile] = min(mins[npile], card.value)
+                    maxs[npile] = max(maxs[npile], card.value)
+            checked.append((npile, card))
+        return checked[0], checked[1]
+
+    def close(self) -> None:
+        """Terminate the worker process and let the worker thread exit, if any."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
@@ -0,0 +1,341 @@
+"""Compact game state engine.
+
+Cards are stored as their integer value (1 to 120) and their color is read from a
+lookup table derived from `DECK`. Since a pile is always sorted, it is stored as a
+bit mask of its cards alongside its min, max and per-color counts, which makes
+games cheap to allocate and to clone.
+"""
+import random
+
+from copy import copy
+
+from ohanami.game import (
+    DECK,
+    OCard,
+    OColor,
+    OGame,
+    OPile,
+    OPlayer,
+    OSeason,
+)
+from ohanami.output import OOutput
+from ohanami.players import OBackend
+
+COLORS: tuple[OColor, ...] = tuple(OColor)
+COLOR_INDEX: dict[OColor, int] = {
+    color: n_color for n_color, color in enumerate(COLORS)
+}
+
+# Color index of each card value, 0 being unused
+CARD_COLORS: bytes = bytes(
+    next(COLOR_INDEX[color] for color, values in DECK.items() if value in values)
+    if value
+    else 0
+    for value in range(121)
+)
+# Shared card objects handed to the backends, indexed by value
+CARDS: tuple[OCard | None, ...] = (None,) + tuple(
+    OCard(value, COLORS[CARD_COLORS[value]]) for value in range(1, 121)
+)
+
+
+def create_compact_deck() -> list[int]:
+    """Create the deck of cards, in the same order as `create_deck`."""
+    cards = []
+    for values in DECK.values():
+        cards += values
+    return cards
+
+
+class CompactPile:
+    """Pile stored as a bit mask of its cards, with running min, max and counts."""
+
+    __slots__ = ("mask", "min", "max", "counts")
+
+    def __init__(self) -> None:
+        self.mask = 0
+        self.min = 121
+        self.max = 0
+        self.counts = [0, 0, 0, 0]
+
+    @property
+    def cards(self) -> list[OCard]:
+        """Cards of the pile, from the smallest to the largest."""
+        return [
+            CARDS[value]
+            for value in range(self.min, self.max + 1)
+            if self.mask >> value & 1
+        ]
+
+    def copy(self) -> "CompactPile":
+        pile = CompactPile.__new__(CompactPile)
+        pile.mask = self.mask
+        pile.min = self.min
+        pile.max = self.max
+        pile.counts = self.counts.copy()
+        return pile
+
+    def get_color(self, color: OColor) -> int:
+        """Get the number of cards of a certain type."""
+        return self.counts[COLOR_INDEX[color]]
+
+    def get_scores(self, season: OSeason) -> dict[OColor, int]:
+        """Get the score for a certain season."""
+        scores = {OColor.WATER: 3 * self.counts[0]}
+        if season is OSeason.SECOND or season is OSeason.THIRD:
+            scores[OColor.LEAF] = 4 * self.counts[1]
+        if season is OSeason.THIRD:
+            scores[OColor.STONE] = 7 * self.counts[2]
+            scores[OColor.SAKURA] = self.counts[3] * (self.counts[3] + 1) // 2
+        return scores
+
+    def add(self, card: "OCard | int", backend: "OBackend | None" = None) -> bool:
+        """Add a card to this pile.
+
+        Returns:
+            True if able to add, False otherwise.
+        """
+        value = card if isinstance(card, int) else card.value
+        if value < self.min:
+            self.min = value
+            if not self.max:
+                self.max = value
+        elif value > self.max:
+            self.max = value
+        else:
+            if backend is not None and backend.noob:
+                return False
+            raise ValueError(
+                f"Card {value} cannot be placed in pile {', '.join([str(card.value) for card in self.cards])} ({backend.__class__.__name__})."
+            )
+        self.mask |= 1 << value
+        self.counts[CARD_COLORS[value]] += 1
+        return True
+
+    @classmethod
+    def from_pile(cls, pile: OPile) -> "CompactPile":
+        compact_pile = cls()
+        for card in pile.cards:
+            compact_pile.add(card.value)
+        return compact_pile
+
+    def to_pile(self) -> OPile:
+        return OPile(self.cards)
+
+
+class CompactPlayer:
+    """Player whose cards are stored as integer values."""
+
+    __slots__ = ("backend", "name", "discarded_cards", "scores", "piles", "hand")
+
+    def __init__(self, backend: OBackend, name: str) -> None:
+        self.backend = backend
+        self.name = name
+        self.discarded_cards: list[int] = []
+        self.scores: list[list[int]] = [[0, 0, 0, 0] for _ in range(3)]
+        self.piles = (CompactPile(), CompactPile(), CompactPile())
+        self.hand: list[int] = []
+
+    @property
+    def score(self) -> int:
+        return sum([sum(turn) for turn in self.scores])
+
+    def play(self, game: "CompactGame") -> None:
+        game.current_seat = game.players.index(self)
+        played_cards = self.backend.play(
+            [CARDS[value] for value in self.hand],
+            (self.piles[0].copy(), self.piles[1].copy(), self.piles[2].copy()),
+            game,
+        )
+        for npile, played_card in played_cards:
+            value = played_card.value
+            self.hand.remove(value)
+            if npile is None:
+                self.discarded_cards.append(value)
+                continue
+            if not self.piles[npile].add(value, backend=self.backend):
+                self.discarded_cards.append(value)
+
+    @classmethod
+    def from_player(cls, player: OPlayer) -> "CompactPlayer":
+        compact_player = cls(player.backend, player.name)
+        compact_player.discarded_cards = [card.value for card in player.discarded_cards]
+        compact_player.scores = [
+            [turn[color] for color in COLORS] for turn in player.scores
+        ]
+        compact_player.piles = (
+            CompactPile.from_pile(player.piles[0]),
+            CompactPile.from_pile(player.piles[1]),
+            CompactPile.from_pile(player.piles[2]),
+        )
+        compact_player.hand = [card.value for card in player.hand]
+        return compact_player
+
+    def to_player(self) -> OPlayer:
+        return OPlayer(
+            self.backend,
+            self.name,
+            discarded_cards=[CARDS[value] for value in self.discarded_cards],
+            scores=[dict(zip(COLORS, turn)) for turn in self.scores],
+            piles=(
+                self.piles[0].to_pile(),
+                self.piles[1].to_pile(),
+                self.piles[2].to_pile(),
+            ),
+            hand=[CARDS[value] for value in self.hand],
+            total_score=self.score,
+        )
+
+
+class CompactGame:
+    """Ohanami game running the same rules as `OGame` on a compact state."""
+
+    __slots__ = (
+        "players",
+        "finished",
+        "current_player",
+        "current_seat",
+        "current_turn",
+        "current_season",
+        "remaining_deck",
+        "rng",
+        "output",
+    )
+
+    # Compact games do not track the cards seen by the players
+    tracker = None
+
+    def __init__(
+        self,
+        players: list[CompactPlayer],
+        rng: random.Random | None = None,
+        output: OOutput | None = None,
+    ) -> None:
+        self.players = players
+        self.finished = False
+        self.current_player: CompactPlayer | None = None
+        self.current_seat: int | None = None
+        self.current_turn = 0
+        self.current_season = OSeason.FIRST
+        self.remaining_deck: list[int] = []
+        self.rng = random.Random() if rng is None else rng
+        self.output = output
+
+    @classmethod
+    def create(
+        cls, players: "list[OBackend | None]", seed: int | None = None
+    ) -> "CompactGame":
+        """Create a new game, seating players like `OGame.create`."""
+        return cls.from_game(OGame.create(players, seed=seed))
+
+    @classmethod
+    def from_game(cls, game: OGame) -> "CompactGame":
+        compact_game = cls(
+            [CompactPlayer.from_player(player) for player in game.players],
+            copy(game.rng),
+            game.output,
+        )
+        compact_game.finished = game.finished
+        if game.current_player is not None:
+            compact_game.current_player = compact_game.players[
+                game.players.index(game.current_player)
+            ]
+        compact_game.current_turn = game.current_turn
+        compact_game.current_season = game.current_season
+        compact_game.remaining_deck = [card.value for card in game.remaining_deck]
+        return compact_game
+
+    def to_game(self) -> OGame:
+        game = self.clone()
+        game.output = self.output
+        return game
+
+    def clone(self, rng: random.Random | None = None) -> OGame:
+        """Return a copy of this game as an `OGame`, for the backends searching it.
+
+        Args:
+            rng: Generator of the copy, see `OGame.clone`.
+        """
+        game = OGame(
+            None,
+            [player.to_player() for player in self.players],
+            rng=copy(self.rng) if rng is None else rng,
+            output=None,
+        )
+        game.finished = self.finished
+        if self.current_player is not None:
+            game.current_player = game.players[self.players.index(self.current_player)]
+        game.current_seat = self.current_seat
+        game.current_turn = self.current_turn
+        game.current_season = self.current_season
+        game.remaining_deck = [CARDS[value] for value in self.remaining_deck]
+        return game
+
+    def deal_cards(self) -> None:
+        deck = create_compact_deck()
+        self.rng.shuffle(deck)
+        for player in self.players:
+            player.hand = deck[:10]
+            deck = deck[10:]
+        self.remaining_deck = deck
+
+    def start(self) -> None:
+        self.deal_cards()
+        while not self.finished:
+            self.turn()
+
+    def reset(self) -> None:
+        for player in self.players:
+            player.scores = [[0, 0, 0, 0] for _ in range(3)]
+            player.hand = []
+            player.piles = (CompactPile(), CompactPile(), CompactPile())
+            player.discarded_cards = []
+        self.current_player = None
+        self.current_season = OSeason.FIRST
+        self.current_turn = 0
+        self.finished = False
+
+    def turn(self) -> None:
+        """Run a complete turn."""
+        if self.current_player is None:
+            self.current_player = self.players[0]
+        self.current_turn += 1
+        for player in self.players:
+            player.play(self)
+        if self.current_season is OSeason.SECOND:
+            hand = self.players[0].hand
+            for player in reversed(self.players):
+                player.hand, hand = hand, player.hand
+        else:
+            hand = self.players[-1].hand
+            for player in self.players:
+                player.hand, hand = hand, player.hand
+        if self.current_turn == 5:
+            self.go_next_season()
+
+    def go_next_season(self) -> None:
+        season = self.current_season.value
+        for player in self.players:
+            scores = player.scores[season]
+            for pile in player.piles:
+                water, leaf, stone, sakura = pile.counts
+                scores[0] += 3 * water
+                if season >= 1:
+                    scores[1] += 4 * leaf
+                if season == 2:
+                    scores[2] += 7 * stone
+                    scores[3] += sakura * (sakura + 1) // 2
+        self.current_turn = 0
+        match self.current_season:
+            case OSeason.FIRST | OSeason.SECOND:
+                self.current_season = OSeason(season + 1)
+                for player in self.players:
+                    player.hand = self.remaining_deck[:10]
+                    self.remaining_deck = self.remaining_deck[10:]
+            case OSeason.THIRD:
+                self.conclude()
+
+    def conclude(self) -> None:
+        self.finished = True
+        if self.output is not None:
+            self.output.write(self.to_game())
@@ -0,0 +1,213 @@
+"""Duplicate-deal tournaments, comparing backends on the same cards.
+
+Each deal is played once per seat rotation of a lineup of backends: the game of
+rotation `r` seats the backend `r` of the lineup first, and all the games of a deal
+share their seed, hence their cards. Averaging the scores of a backend over the
+rotations of a deal, and comparing them with those of another backend on the same
+deal, cancels the luck of the deal shared by all the backends.
+
+Differences between backends are reported with the standard error of their paired
+per-deal differences, and with the one the same number of independent games would
+give, the ratio of their variances estimating how many times fewer games the
+duplicate deals need for the same confidence. Since hands are passed around, a deal
+does not favor a seat much, and how a deal suits a backend rather than another is
+not cancelled, so the reduction depends on the backends and may be below 1.
+"""
+import random
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed,
+)
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from ohanami.game import (
+    OGame,
+    derive_seeds,
+    play_games,
+)
+from ohanami.players import OBackend
+
+
+@dataclass
+class OPairedDifference:
+    """Mean score difference of two backends over the deals."""
+
+    first: type[OBackend]
+    second: type[OBackend]
+    mean: float
+    # Standard error of the mean of the paired per-deal differences
+    paired_se: float
+    # Standard error the same number of independent games would have
+    independent_se: float
+
+    @property
+    def reduction(self) -> float:
+        """How many times fewer games the paired difference needs."""
+        if not self.paired_se:
+            return float("inf")
+        return (self.independent_se / self.paired_se) ** 2
+
+
+@dataclass
+class ODuplicateResults:
+    """Scores of the deals of a duplicate tournament.
+
+    Args:
+        lineup: Backend of each position of the lineup.
+        scores: Score of each position of the lineup, in each rotation of each deal,
+                of shape (deals, rotations, players).
+    """
+
+    lineup: list[type[OBackend]]
+    scores: np.ndarray
+
+    @property
+    def backends(self) -> list[type[OBackend]]:
+        return list(dict.fromkeys(self.lineup))
+
+    def game_means(self) -> np.ndarray:
+        """Mean score of each backend in each game, of shape (deals, rotations, backends)."""
+        return np.stack(
+            [
+                self.scores[
+                    :, :, [n for n, other in enumerate(self.lineup) if other is backend]
+                ].mean(axis=2)
+                for backend in self.backends
+            ],
+            axis=2,
+        )
+
+    def differences(self) -> list[OPairedDifference]:
+        """Get the paired difference of each pair of backends, best first."""
+        backends = self.backends
+        means = self.game_means()
+        deals, rotations, _ = means.shape
+        differences = []
+        for first in range(len(backends)):
+            for second in range(first + 1, len(backends)):
+                games = means[:, :, first] - means[:, :, second]
+                paired = games.mean(axis=1)
+                # a game alone has the distribution of an independent game
+                difference = OPairedDifference(
+                    backends[first],
+                    backends[second],
+                    float(paired.mean()),
+                    float(paired.std(ddof=1) / np.sqrt(deals)) if deals > 1 else 0.0,
+                    float(games.std(ddof=1) / np.sqrt(games.size))
+                    if games.size > 1
+                    else 0.0,
+                )
+                if difference.mean < 0:
+                    difference.first, difference.second = (
+                        difference.second,
+                        difference.first,
+                    )
+                    difference.mean = -difference.mean
+                differences.append(difference)
+        return differences
+
+    def format(self) -> str:
+        """Format the paired differences, one pair per line."""
+        return "\n".join(
+            f"{difference.first.__name__} - {difference.second.__name__}: "
+            f"{difference.mean:.2f} +- {difference.paired_se:.2f} "
+            f"(independent games +- {difference.independent_se:.2f}, "
+            f"{difference.reduction:.1f}x fewer games)"
+            for difference in self.differences()
+        )
+
+
+def rotate(lineup: list[type[OBackend]]) -> list[int]:
+    """Get the shifts of the distinct rotations of a lineup.
+
+    Games of the same seating and seed are identical, so a lineup repeating itself,
+    like `[Centrist, BetterBeSafe, Centrist, BetterBeSafe]`, has fewer rotations.
+    """
+    seatings: dict[tuple[type[OBackend], ...], int] = {}
+    for shift in range(len(lineup)):
+        seatings.setdefault(tuple(lineup[shift:] + lineup[:shift]), shift)
+    return list(seatings.values())
+
+
+def play_deals(
+    seed: int, offset: int, deals: int, lineup: list[type[OBackend]]
+) -> np.ndarray:
+    """Play every rotation of a shard of deals in lockstep.
+
+    Deals are seeded from the master seed and their index in the tournament, the
+    shard starting at deal `offset`.
+
+    Returns:
+        The scores of the shard, see `ODuplicateResults.scores`.
+    """
+    players = len(lineup)
+    shifts = rotate(lineup)
+    games = []
+    for deal_seed in derive_seeds(seed, deals, offset):
+        for shift in shifts:
+            game = OGame.create(
+                [backend() for backend in lineup[shift:] + lineup[:shift]],
+                seed=deal_seed,
+                shuffle=False,
+            )
+            game.output = None
+            games.append(game)
+    play_games(games)
+    for game in games:
+        game.close()
+    scores = np.array(
+        [[player.score for player in game.players] for game in games],
+        dtype=np.int32,
+    ).reshape(deals, len(shifts), players)
+    # the seat `seat` of the rotation `shift` holds the position `shift + seat`
+    positions = (np.array(shifts)[:, None] + np.arange(players)[None, :]) % players
+    ordered = np.empty_like(scores)
+    ordered[:, np.arange(len(shifts))[:, None], positions] = scores
+    return ordered
+
+
+def run_duplicate(
+    deals: int,
+    lineup: list[type[OBackend]],
+    seed: int | None = None,
+    workers: int | None = None,
+    shard_size: int = 250,
+    progress: Callable[[int, int], None] | None = None,
+) -> ODuplicateResults:
+    """Play a duplicate tournament over a pool of worker processes.
+
+    Results only depend on the master seed, not on the number of workers nor on the
+    shard size.
+
+    Args:
+        deals: Number of deals, each played once per rotation of the lineup.
+        lineup: Backend of each seat, a backend appearing several times playing
+                several seats.
+        seed: Master seed, random if None.
+        workers: Number of worker processes, defaults to the number of CPUs.
+        shard_size: Number of deals per shard.
+        progress: Called in the main process with the number of completed shards
+                  and the total number of shards each time a shard completes.
+
+    Returns:
+        The scores of the deals.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    offsets = list(range(0, deals, shard_size))
+    sizes = [min(shard_size, deals - offset) for offset in offsets]
+    results: list[np.ndarray] = [np.zeros(0) for _ in sizes]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(play_deals, seed, offset, size, lineup): n_shard
+            for n_shard, (offset, size) in enumerate(zip(offsets, sizes))
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(done, len(sizes))
+    return ODuplicateResults(list(lineup), np.concatenate(results))
@@ -0,0 +1,187 @@
+"""Fixed-size numeric observations of the players, for learning pipelines.
+
+An observation is what a player knows when asked for a move, see `OBackend.play`,
+written as a row of `OBSERVATION_SIZE` floats. The features are laid out as
+follows, see `FEATURES`:
+
+- hand: one-hot of the card values in the hand (120),
+- slots: card values of the hand slots, 0 for an empty slot (10),
+- seats: for the player then each opponent in seat order, the min, max and color
+  counts of each pile, the total score, the hand size and 1 if the seat is taken,
+  0 everywhere for the missing seats of a 3 players game (4 x 21),
+- season: one-hot of the season (3),
+- turn: one-hot of the turn within the season (5),
+- seen: one-hot of the card values seen by the player (120). In games tracking
+  cards, see `OGame.tracker`, these are all the cards it has held and the cards of
+  all piles. Otherwise, only its current hand, its discarded cards and the cards of
+  all piles are known to have been seen, the hands it held earlier in the season
+  being left out.
+
+Values are written raw, an empty pile having a min of 121 and a max of 0 as
+`OPile`. The features of a batch are read from the pile counters and the bit masks
+of card values of the piles and of the tracker, see `ohanami.tracking`, and the
+one-hot planes are written with NumPy indexing, once per batch.
+
+An action picks the hand slot and the pile of each of the two cards played, the
+pile index being `DISCARD` for a discard: `((first_slot * 4 + first_pile) * 10 +
+second_slot) * 4 + second_pile`, among `ACTIONS`.
+"""
+import numpy as np
+
+from ohanami.game import (
+    OCard,
+    OGame,
+)
+from ohanami.tracking import to_mask
+
+Move = tuple[tuple[int | None, OCard], tuple[int | None, OCard]]
+
+DISCARD = 3
+ACTIONS = (10 * 4) ** 2
+SEATS = 4
+SEAT_FEATURES = 3 * 6 + 3
+# Features of the missing seats of a game, by number of players
+EMPTY_SEATS = [[0] * (SEATS - players) * SEAT_FEATURES for players in range(SEATS + 1)]
+
+
+def _layout(sizes: dict[str, int]) -> dict[str, slice]:
+    features, offset = {}, 0
+    for name, size in sizes.items():
+        features[name] = slice(offset, offset + size)
+        offset += size
+    return features
+
+
+FEATURES: dict[str, slice] = _layout(
+    {
+        "hand": 120,
+        "slots": 10,
+        "seats": SEATS * SEAT_FEATURES,
+        "season": 3,
+        "turn": 5,
+        "seen": 120,
+    }
+)
+OBSERVATION_SIZE = FEATURES["seen"].stop
+
+
+def unpack_masks(masks: list[int]) -> np.ndarray:
+    """Get the one-hot planes of card value masks, of shape (masks, 120)."""
+    packed = np.frombuffer(
+        b"".join(mask.to_bytes(16, "little") for mask in masks), dtype=np.uint8
+    ).reshape(len(masks), 16)
+    return np.unpackbits(packed, axis=1, bitorder="little")[:, 1:121]
+
+
+def create_buffer(observations: int) -> np.ndarray:
+    """Create a buffer holding a batch of observations."""
+    return np.zeros((observations, OBSERVATION_SIZE), dtype=np.float32)
+
+
+def find_seats(hands: list[list[OCard]], games: list[OGame]) -> list[int]:
+    """Find the seats of the players whose hands are given, see `OBackend.play_batch`.
+
+    Hands are disjoint, so the first card of a hand is enough to find its player.
+    """
+    return [
+        next(
+            n_player
+            for n_player, player in enumerate(game.players)
+            if player.hand and player.hand[0] is cards[0]
+        )
+        for cards, game in zip(hands, games)
+    ]
+
+
+def encode(
+    games: list[OGame], seats: list[int], out: np.ndarray | None = None
+) -> np.ndarray:
+    """Write the observations of a player of each game into a buffer.
+
+    Args:
+        games: Games being played.
+        seats: Seat of the observing player in each game.
+        out: Buffer receiving the observations in its first rows, created if None.
+
+    Returns:
+        The rows of the buffer holding the observations.
+    """
+    if out is None:
+        out = create_buffer(len(games))
+    observations = out[: len(games)]
+    observations.fill(0)
+    # card values of the hand slots, as bytes since they are below 128
+    slots = bytearray()
+    seen = []
+    seats_features: list[int] = []
+    for game, seat in zip(games, seats):
+        players = game.players[seat:] + game.players[:seat]
+        player = players[0]
+        slots += bytes(card.value for card in player.hand).ljust(10, b"\0")
+        if game.tracker is not None:
+            seen.append(game.tracker.seen[seat] | game.tracker.public)
+        else:
+            mask = to_mask(player.discarded_cards)
+            for other in players:
+                for pile in other.piles:
+                    mask |= pile.mask
+            seen.append(mask)
+        for other in players:
+            for pile in other.piles:
+                seats_features += (pile.min, pile.max, *pile.counts.values())
+            seats_features += (other.total_score, len(other.hand), 1)
+        seats_features += EMPTY_SEATS[len(players)]
+    rows = np.arange(len(games))
+    values = np.frombuffer(slots, dtype=np.uint8).reshape(len(games), 10)
+    observations[:, FEATURES["slots"]] = values
+    observations[:, FEATURES["seats"]] = np.array(
+        seats_features, dtype=np.int32
+    ).reshape(len(games), SEATS * SEAT_FEATURES)
+    observations[:, FEATURES["seen"]] = unpack_masks(seen)
+    hand_rows, hand_slots = np.nonzero(values)
+    hand_values = values[hand_rows, hand_slots].astype(np.intp)
+    observations[hand_rows, FEATURES["hand"].start - 1 + hand_values] = 1
+    # the hand is seen, which untracked games leave out of their masks
+    observations[hand_rows, FEATURES["seen"].start - 1 + hand_values] = 1
+    observations[
+        rows, [FEATURES["season"].start + game.current_season.value for game in games]
+    ] = 1
+    observations[
+        rows,
+        [FEATURES["turn"].start + max(game.current_turn - 1, 0) for game in games],
+    ] = 1
+    return observations
+
+
+def encode_action(move: Move, cards: list[OCard]) -> int:
+    """Get the action index of a move played from a hand."""
+    action = 0
+    for npile, card in move:
+        action = (action * 10 + cards.index(card)) * 4 + (
+            DISCARD if npile is None else npile
+        )
+    return action
+
+
+def decode_action(action: int, cards: list[OCard]) -> Move:
+    """Get the move of an action index played from a hand.
+
+    Raises:
+        ValueError: If the action plays an empty hand slot, or the same slot twice.
+    """
+    first, second = divmod(action, 40)
+    first_slot, first_pile = divmod(first, 4)
+    second_slot, second_pile = divmod(second, 4)
+    if first_slot == second_slot or max(first_slot, second_slot) >= len(cards):
+        raise ValueError(f"Action {action} is invalid for a hand of {len(cards)}.")
+    return (
+        (None if first_pile == DISCARD else first_pile, cards[first_slot]),
+        (None if second_pile == DISCARD else second_pile, cards[second_slot]),
+    )
+
+
+def decode_actions(actions: np.ndarray, hands: list[list[OCard]]) -> list[Move]:
+    """Get the moves of a batch of action indices, see `decode_action`."""
+    return [
+        decode_action(action, cards) for action, cards in zip(actions.tolist(), hands)
+    ]
@@ -1,17 +1,37 @@
 """Ohanami game core module."""
-from copy import deepcopy
+from copy import copy
 from dataclasses import (
     dataclass,
     field,
 )
 from enum import Enum
+from functools import partial
+import gc
 import random
+import time
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+)
 
 from ohanami.players import (
     AVAILABLE_PLAYERS,
+    OAsyncAdapter,
+    OAsyncBackend,
     OBackend,
 )
-from ohanami.display import ODisplay
+from ohanami.budget import OBudget
+from ohanami.output import (
+    OOutput,
+    OTableOutput,
+)
+from ohanami.profiling import OProfiler
+
+if TYPE_CHECKING:
+    # curses is only needed by interactive games
+    from ohanami.display import ODisplay
+    from ohanami.tracking import OCardTracker
 
 
 class OColor(Enum):
@@ -46,12 +66,16 @@ DECK = {
 # fmt: on
 
 
-@dataclass
+@dataclass(frozen=True)
 class OCard:
     value: int
     color: OColor
 
 
+# Cards played by a player, with their pile, None for a discard
+Move = tuple[tuple[int | None, OCard], tuple[int | None, OCard]]
+
+
 def create_empty_scoreboard() -> list[dict[OColor, int]]:
     return [
         {OColor.WATER: 0, OColor.LEAF: 0, OColor.STONE: 0, OColor.SAKURA: 0}
@@ -61,42 +85,63 @@ def create_empty_scoreboard() -> list[dict[OColor, int]]:
 
 @dataclass
 class OPile:
-    cards: list[OCard] = field(default_factory=list)
-
-    @property
-    def min(self) -> int:
-        """Return the minimum value of a pile.
+    """Pile of cards, sorted from the smallest to the largest.
 
-        Returns 121 if not card in the pile."""
-        if not self.cards:
-            return 121
-        return self.cards[0].value
-
-    @property
-    def max(self) -> int:
-        """Return the maximum value of a pile.
+    The minimum and maximum values (121 and 0 for an empty pile), the number of
+    cards of each color and the bit mask of the card values are maintained as cards
+    are added, so the cards list must only be modified through `add`.
+    """
 
-        Returns 0 if not card in the pile."""
-        if not self.cards:
-            return 0
-        return self.cards[-1].value
+    cards: list[OCard] = field(default_factory=list)
+    min: int = field(default=121, init=False, repr=False, compare=False)
+    max: int = field(default=0, init=False, repr=False, compare=False)
+    counts: dict[OColor, int] = field(init=False, repr=False, compare=False)
+    mask: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.counts = {color: 0 for color in OColor}
+        for card in self.cards:
+            self.counts[card.color] += 1
+            self.mask |= 1 << card.value
+        if self.cards:
+            self.min = self.cards[0].value
+            self.max = self.cards[-1].value
 
     def get_color(self, color: OColor) -> int:
         """Get the number of cards of a certain type."""
-        return len([card for card in self.cards if card.color is color])
+        return self.counts[color]
 
     def get_scores(self, season: OSeason) -> dict[OColor, int]:
         """Get the score for a certain season."""
-        scores = {OColor.WATER: 3 * self.get_color(OColor.WATER)}
+        scores = {OColor.WATER: 3 * self.counts[OColor.WATER]}
         if season is OSeason.SECOND or season is OSeason.THIRD:
-            scores[OColor.LEAF] = 4 * self.get_color(OColor.LEAF)
+            scores[OColor.LEAF] = 4 * self.counts[OColor.LEAF]
         if season is OSeason.THIRD:
-            scores[OColor.STONE] = 7 * self.get_color(OColor.STONE)
-            scores[OColor.SAKURA] = sum(
-                [i for i in range(1, self.get_color(OColor.SAKURA) + 1)]
-            )
+            scores[OColor.STONE] = 7 * self.counts[OColor.STONE]
+            sakura = self.counts[OColor.SAKURA]
+            scores[OColor.SAKURA] = sakura * (sakura + 1) // 2
         return scores
 
+    def copy(self) -> "OPile":
+        """Return a pile that can be modified without affecting this one.
+
+        Cards are immutable, so only the list holding them is copied."""
+        pile = OPile.__new__(OPile)
+        pile.cards = list(self.cards)
+        pile.min = self.min
+        pile.max = self.max
+        pile.counts = self.counts.copy()
+        pile.mask = self.mask
+        return pile
+
+    def clear(self) -> None:
+        """Remove all the cards of this pile."""
+        self.cards = []
+        self.min = 121
+        self.max = 0
+        self.counts = {color: 0 for color in OColor}
+        self.mask = 0
+
     def add(self, card: OCard, backend: "OBackend | None" = None) -> bool:
         """Add a card to this pile.
 
@@ -105,19 +150,117 @@ class OPile:
         """
         if not self.cards:
             self.cards.append(card)
-            return True
-        if card.value < self.min:
+            self.min = self.max = card.value
+        elif card.value < self.min:
             self.cards.insert(0, card)
+            self.min = card.value
         elif card.value > self.max:
             self.cards.append(card)
+            self.max = card.value
         else:
             if backend is not None and backend.noob:
                 return False
             raise ValueError(
                 f"Card {card.value} cannot be placed in pile {', '.join([str(card.value) for card in self.cards])} ({backend.__class__.__name__})."
             )
+        self.counts[card.color] += 1
+        self.mask |= 1 << card.value
         return True
 
+    def remove(self, card: OCard) -> None:
+        """Remove a card previously added at either end of this pile."""
+        if self.cards[-1] is card:
+            self.cards.pop()
+        elif self.cards[0] is card:
+            self.cards.pop(0)
+        else:
+            raise ValueError(f"Card {card.value} is not at an end of the pile.")
+        self.counts[card.color] -= 1
+        self.mask &= ~(1 << card.value)
+        if self.cards:
+            self.min = self.cards[0].value
+            self.max = self.cards[-1].value
+        else:
+            self.min = 121
+            self.max = 0
+
+
+class OPileView:
+    """Copy-on-write view of a pile, handed to backends in place of a copy.
+
+    Reads go straight to the underlying pile. The first call to `add` copies the
+    pile into a scratch overlay, so backends can try out moves without ever
+    modifying the real pile. The `cards` list must not be mutated directly.
+    """
+
+    __slots__ = ("_pile", "_owned")
+
+    def __init__(self, pile: OPile) -> None:
+        self._pile = pile
+        self._owned = False
+
+    @property
+    def cards(self) -> list[OCard]:
+        return self._pile.cards
+
+    @property
+    def min(self) -> int:
+        return self._pile.min
+
+    @property
+    def max(self) -> int:
+        return self._pile.max
+
+    @property
+    def mask(self) -> int:
+        return self._pile.mask
+
+    def get_color(self, color: OColor) -> int:
+        return self._pile.get_color(color)
+
+    def get_scores(self, season: OSeason) -> dict[OColor, int]:
+        return self._pile.get_scores(season)
+
+    def copy(self) -> OPile:
+        return self._pile.copy()
+
+    def add(self, card: OCard, backend: "OBackend | None" = None) -> bool:
+        """Add a card to the scratch overlay of this view."""
+        if not self._owned:
+            self._pile = self._pile.copy()
+            self._owned = True
+        return self._pile.add(card, backend=backend)
+
+
+# Season, remaining deck, hands, season scores and total score of each player, and
+# finished flag of a game
+SeasonState = tuple[
+    OSeason, list[OCard], list[list[OCard]], list[tuple[dict[OColor, int], int]], bool
+]
+
+
+@dataclass
+class OMove:
+    """Record of the cards played by a player, allowing to undo them.
+
+    Each entry holds the card played, its index in the hand and the pile it was
+    placed on, None if discarded."""
+
+    player: "OPlayer"
+    cards: list[tuple[OCard, int, OPile | None]]
+
+
+@dataclass
+class OTurn:
+    """Record of a turn played through `OGame.apply_turn`."""
+
+    moves: list[OMove]
+    current_player: "OPlayer | None"
+    # Season state before scoring, if the turn ended the season
+    season: "SeasonState | None" = None
+    # Card tracker before the turn, if the game has one
+    tracker: "OCardTracker | None" = None
+
 
 @dataclass
 class OPlayer:
@@ -131,43 +274,173 @@ class OPlayer:
         default_factory=lambda: (OPile(), OPile(), OPile())
     )
     hand: list[OCard] = field(default_factory=list)
+    # Running sum of the scores, kept up to date by the game
+    total_score: int = 0
+    # Time spent by the backend in the game, only kept when the game has a budget
+    time_spent: float = 0.0
 
     @property
     def score(self) -> int:
-        return sum([sum(turn.values()) for turn in self.scores])
+        return self.total_score
 
     def play(self, game: "OGame") -> None:
-        played_cards = self.backend.play(list(self.hand), deepcopy(self.piles), game)
+        piles = (
+            OPileView(self.piles[0]),
+            OPileView(self.piles[1]),
+            OPileView(self.piles[2]),
+        )
+        play = (
+            self.backend.play
+            if game.budget is None
+            else partial(game.budget.play, self)
+        )
+        profiler = game.profiler
+        game.current_seat = game.players.index(self)
+        if profiler is None:
+            played_cards = play(list(self.hand), piles, game)
+        else:
+            played_cards = profiler.time_play(
+                self.backend, play, list(self.hand), piles, game
+            )
+        self.commit(played_cards, game)
+
+    async def play_async(self, game: "OGame") -> None:
+        """Await the move of the backend, synchronous backends being adapted."""
+        piles = (
+            OPileView(self.piles[0]),
+            OPileView(self.piles[1]),
+            OPileView(self.piles[2]),
+        )
+        backend = self.backend
+        if not isinstance(backend, OAsyncBackend):
+            backend = OAsyncAdapter(backend)
+        game.current_seat = game.players.index(self)
+        if game.profiler is None:
+            played_cards = await backend.play_async(list(self.hand), piles, game)
+        else:
+            start = time.perf_counter()
+            played_cards = await backend.play_async(list(self.hand), piles, game)
+            game.profiler.add_play(self.backend, time.perf_counter() - start)
+        self.commit(played_cards, game)
+
+    def commit(
+        self,
+        played_cards: "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]",
+        game: "OGame",
+    ) -> None:
+        """Apply the move of the backend, recording it in the game."""
+        if game.history is not None:
+            game.history += [(npile, card.value) for npile, card in played_cards]
+        if game.profiler is None:
+            move = self.apply(played_cards)
+        else:
+            move = game.profiler.time("apply", self.apply, played_cards)
+        if game.tracker is not None:
+            game.tracker.play(game.players.index(self), move)
+
+    def apply(
+        self, played_cards: "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]"
+    ) -> OMove:
+        """Play cards from the hand, discarding the ones not fitting their pile."""
+        move = OMove(self, [])
         for npile, played_card in played_cards:
-            card = next(card for card in self.hand if card.value == played_card.value)
-            self.hand.remove(card)
-            if npile is None:
-                self.discarded_cards.append(card)
-                continue
-            pile = self.piles[npile]
-            if not pile.add(card, backend=self.backend):
+            index = next(
+                index
+                for index, card in enumerate(self.hand)
+                if card.value == played_card.value
+            )
+            card = self.hand.pop(index)
+            pile = None if npile is None else self.piles[npile]
+            if pile is None or not pile.add(card, backend=self.backend):
                 self.discarded_cards.append(card)
+                pile = None
+            move.cards.append((card, index, pile))
+        return move
+
+    def undo(self, move: OMove) -> None:
+        """Take back into the hand the cards of a move."""
+        for card, index, pile in reversed(move.cards):
+            if pile is None:
+                self.discarded_cards.pop()
+            else:
+                pile.remove(card)
+            self.hand.insert(index, card)
+
+    def clone(self) -> "OPlayer":
+        """Return a copy of this player sharing only its backend."""
+        return OPlayer(
+            self.backend,
+            self.name,
+            discarded_cards=list(self.discarded_cards),
+            scores=[dict(turn) for turn in self.scores],
+            piles=(self.piles[0].copy(), self.piles[1].copy(), self.piles[2].copy()),
+            hand=list(self.hand),
+            total_score=self.total_score,
+            time_spent=self.time_spent,
+        )
 
 
 @dataclass
 class OGame:
     """Class defining an ohanami game."""
 
-    display: ODisplay | None
+    display: "ODisplay | None"
     players: list[OPlayer]
     finished: bool = False
     current_player: OPlayer | None = None
+    # Seat of the player whose backend is asked its move, set before each move
+    current_seat: int | None = None
     current_turn: int = 0
     current_season: OSeason = OSeason.FIRST
     remaining_deck: list[OCard] = field(default_factory=list)
+    # Seed of the game generator, used by the game and its backends
+    seed: int | None = None
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+    # Sink of the game once finished, None to skip any formatting
+    output: OOutput | None = field(default_factory=OTableOutput, repr=False)
+    # If not None, time limits of the backends moves
+    budget: OBudget | None = field(default=None, repr=False)
+    # If not None, times the phases of the game and the moves of the backends
+    profiler: OProfiler | None = field(default=None, repr=False)
+    # If not None, records the (pile, card value) choices of every played card
+    history: list[tuple[int | None, int]] | None = field(default=None, repr=False)
+    # If not None, tracks the cards seen by each player
+    tracker: "OCardTracker | None" = field(default=None, repr=False)
+    # State of the generator once the players are seated, set by `create`
+    initial_rng_state: tuple | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
-    def create(cls, players: "list[OBackend | None]") -> "OGame":
-        """Create a new game."""
-        game = cls(None, [])
+    def create(
+        cls,
+        players: "list[OBackend | None]",
+        seed: int | None = None,
+        available: "list[type[OBackend]] | None" = None,
+        shuffle: bool = True,
+        track: bool = False,
+    ) -> "OGame":
+        """Create a new game.
+
+        Args:
+            players: Backends of the players, None to draw one from `available`.
+            seed: Seed of the game generator, random if None.
+            available: Backends drawn for the None players, defaults to all the
+                       available ones.
+            shuffle: If False, players are seated in the order of `players`, so
+                     that without drawn backends, the deal only depends on the
+                     seed whatever the seating.
+            track: Whether to track the cards seen by each player, see
+                   `ohanami.tracking.OCardTracker`.
+        """
+        game = cls(None, [], seed=seed, rng=random.Random(seed))
+        if track:
+            from ohanami.tracking import OCardTracker
+
+            game.tracker = OCardTracker()
         for backend in players:
             if backend is None:
-                backend = random.choice(AVAILABLE_PLAYERS)()
+                backend = game.rng.choice(available or AVAILABLE_PLAYERS)()
             ID = 1
             name = f"{backend.__class__.__name__}_{ID}"
             while (
@@ -177,45 +450,132 @@ class OGame:
                 ID += 1
                 name = f"{backend.__class__.__name__}_{ID}"
             game.players.append(OPlayer(backend, name))
-        random.shuffle(game.players)
+        if shuffle:
+            game.rng.shuffle(game.players)
+        game.initial_rng_state = game.rng.getstate()
         return game
 
     def deal_cards(self) -> None:
         deck = create_deck()
-        random.shuffle(deck)
+        self.rng.shuffle(deck)
         for player in self.players:
             player.hand = deck[:10]
             deck = deck[10:]
         self.remaining_deck = deck
+        if self.tracker is not None:
+            self.tracker.deal([player.hand for player in self.players], len(deck), True)
 
     def start(self) -> None:
-        self.deal_cards()
+        if self.profiler is None:
+            self.deal_cards()
+        else:
+            self.profiler.time("deal", self.deal_cards)
         if self.display:
             self.display.main()
             return
         while not self.finished:
             self.turn()
 
+    async def start_async(self) -> None:
+        """Play the game in an event loop, awaiting the moves of the backends.
+
+        Time budgets are not supported, and profiled moves include the time spent
+        waiting for them.
+        """
+        if self.budget is not None:
+            raise ValueError("Time budgets are not supported by asynchronous games.")
+        if self.profiler is None:
+            self.deal_cards()
+        else:
+            self.profiler.time("deal", self.deal_cards)
+        while not self.finished:
+            await self.turn_async()
+
     def reset(self) -> None:
         for player in self.players:
             player.scores = create_empty_scoreboard()
+            player.total_score = 0
+            player.time_spent = 0.0
             player.hand = []
             for pile in player.piles:
-                pile.cards = []
+                pile.clear()
             player.discarded_cards = []
         self.current_player = None
+        self.current_seat = None
         self.current_season = OSeason.FIRST
         self.current_turn = 0
         self.finished = False
+        if self.history is not None:
+            self.history = []
+        if self.tracker is not None:
+            self.tracker.deal([[] for _ in self.players], 0, True)
+
+    def replay(self) -> None:
+        """Reset the game and its generator, so that it is played again identically."""
+        if self.initial_rng_state is None:
+            raise ValueError("Only games created with OGame.create can be replayed.")
+        self.reset()
+        self.rng.setstate(self.initial_rng_state)
+
+    def clone(self, rng: random.Random | None = None) -> "OGame":
+        """Return a copy of this game, without display, sharing only the backends.
+
+        Args:
+            rng: Generator of the copy. Defaults to a copy of the game generator,
+                 which is the most expensive part of cloning, so searches cloning
+                 many times should rather pass their own generator.
+        """
+        game = OGame(
+            None,
+            [player.clone() for player in self.players],
+            seed=self.seed,
+            rng=copy(self.rng) if rng is None else rng,
+            output=None,
+        )
+        game.initial_rng_state = self.initial_rng_state
+        game.finished = self.finished
+        if self.current_player is not None:
+            game.current_player = game.players[self.players.index(self.current_player)]
+        game.current_seat = self.current_seat
+        game.current_turn = self.current_turn
+        game.current_season = self.current_season
+        game.remaining_deck = list(self.remaining_deck)
+        if self.tracker is not None:
+            game.tracker = self.tracker.copy()
+        return game
 
     def turn(self) -> None:
         """Run a complete turn."""
+        self.begin_turn()
+        for player in self.players:
+            player.play(self)
+        self.end_turn()
+
+    async def turn_async(self) -> None:
+        """Run a complete turn, awaiting the moves of the players in turn."""
+        self.begin_turn()
+        for player in self.players:
+            await player.play_async(self)
+        self.end_turn()
+
+    def begin_turn(self) -> None:
+        """Start a turn, before the players play."""
         if self.current_player is None:
             self.current_player = self.players[0]
         self.current_turn += 1
-        for player in self.players:
-            player.play(self)
-        if self.current_season is OSeason.SECOND:
+
+    def end_turn(self) -> None:
+        """End a turn once the players played, passing hands and scoring seasons."""
+        if self.profiler is None:
+            self.rotate_hands()
+        else:
+            self.profiler.time("rotate", self.rotate_hands)
+        if self.current_turn == 5:
+            self.go_next_season()
+
+    def rotate_hands(self, reverse: bool = False) -> None:
+        """Pass the hands to the next players, in the direction of the season."""
+        if (self.current_season is OSeason.SECOND) is not reverse:
             hand = self.players[0].hand
             for player in reversed(self.players):
                 player.hand, hand = hand, player.hand
@@ -223,14 +583,86 @@ class OGame:
             hand = self.players[-1].hand
             for player in self.players:
                 player.hand, hand = hand, player.hand
+        # hands passed back are restored with the tracker by `undo_turn`
+        if self.tracker is not None and not reverse:
+            self.tracker.pass_hands(
+                [player.hand for player in self.players],
+                self.current_season is OSeason.SECOND,
+            )
+
+    def apply_move(
+        self,
+        n_player: int,
+        played_cards: "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]",
+    ) -> OMove:
+        """Play cards for a player without calling its backend."""
+        move = self.players[n_player].apply(played_cards)
+        if self.tracker is not None:
+            self.tracker.play(n_player, move)
+        return move
+
+    def undo_move(self, move: OMove) -> None:
+        move.player.undo(move)
+        if self.tracker is not None:
+            self.tracker.undo(self.players.index(move.player), move)
+
+    def apply_turn(
+        self,
+        played_cards: "list[tuple[tuple[int | None, OCard], tuple[int | None, OCard]]]",
+    ) -> OTurn:
+        """Run a complete turn with the given cards of each player."""
+        turn = OTurn([], self.current_player)
+        if self.tracker is not None:
+            turn.tracker = self.tracker.copy()
+        if self.current_player is None:
+            self.current_player = self.players[0]
+        self.current_turn += 1
+        for n_player, (player, cards) in enumerate(zip(self.players, played_cards)):
+            move = player.apply(cards)
+            if self.tracker is not None:
+                self.tracker.play(n_player, move)
+            turn.moves.append(move)
+        self.rotate_hands()
         if self.current_turn == 5:
+            season = self.current_season.value
+            turn.season = (
+                self.current_season,
+                self.remaining_deck,
+                [player.hand for player in self.players],
+                [
+                    (dict(player.scores[season]), player.total_score)
+                    for player in self.players
+                ],
+                self.finished,
+            )
             self.go_next_season()
+        return turn
+
+    def undo_turn(self, turn: OTurn) -> None:
+        """Restore the game as it was before a turn played with `apply_turn`."""
+        if turn.season is not None:
+            season, self.remaining_deck, hands, scores, self.finished = turn.season
+            self.current_season = season
+            self.current_turn = 5
+            for player, hand, (season_scores, total_score) in zip(
+                self.players, hands, scores
+            ):
+                player.hand = hand
+                player.scores[season.value] = season_scores
+                player.total_score = total_score
+        self.rotate_hands(reverse=True)
+        for move in reversed(turn.moves):
+            move.player.undo(move)
+        self.current_turn -= 1
+        self.current_player = turn.current_player
+        if turn.tracker is not None:
+            self.tracker = turn.tracker
 
     def go_next_season(self) -> None:
-        for player in self.players:
-            for pile in player.piles:
-                for color, score in pile.get_scores(self.current_season).items():
-                    player.scores[self.current_season.value][color] += score
+        if self.profiler is None:
+            self.score_season()
+        else:
+            self.profiler.time("score", self.score_season)
         self.current_turn = 0
         match self.current_season:
             case OSeason.FIRST:
@@ -245,14 +677,40 @@ class OGame:
                     self.remaining_deck = self.remaining_deck[10:]
             case OSeason.THIRD:
                 self.conclude()
+        if self.tracker is not None and not self.finished:
+            self.tracker.deal(
+                [player.hand for player in self.players],
+                len(self.remaining_deck),
+                False,
+            )
+
+    def score_season(self) -> None:
+        """Add the scores of the current season to the players scores."""
+        for player in self.players:
+            scores = player.scores[self.current_season.value]
+            for pile in player.piles:
+                for color, score in pile.get_scores(self.current_season).items():
+                    scores[color] += score
+                    player.total_score += score
 
     def conclude(self) -> None:
-        print()
-        print("# Concluding")
         self.finished = True
-        self.display_scores()
+        if self.output is None:
+            return
+        if self.profiler is None:
+            self.output.write(self)
+        else:
+            self.profiler.time("output", self.output.write, self)
+
+    def close(self) -> None:
+        """Release the resources of the backends of the players, see `OBackend.close`."""
+        for player in self.players:
+            player.backend.close()
 
     def display_scores(self) -> None:
+        print(self.format_scores())
+
+    def format_scores(self) -> str:
         data = {}
         max_score = max([player.score for player in self.players])
         for player in self.players:
@@ -283,7 +741,124 @@ class OGame:
         lines += ["|" + "_" * names_width + "|"]
         for col_width in col_widths:
             lines[-1] += "_" * col_width + "|"
-        print("\n".join(lines))
+        return "\n".join(lines)
+
+
+def play_games(
+    games: list[OGame],
+    record: "Callable[[list[tuple[OGame, OPlayer, Move]]], None] | None" = None,
+    freeze_gc: bool = False,
+) -> None:
+    """Play games in lockstep, batching the moves of each backend class at each turn.
+
+    The players of a backend class overriding `OBackend.play_batch` are asked for
+    their moves in one call per turn, on one of their backends, their games not
+    telling their seat, see `OGame.current_seat`. The other ones are asked one by
+    one. As in the actual game, the players of a turn all choose their
+    cards before any is placed. Each batch of moves is timed as a single move, in the
+    profiler of its first game.
+
+    Args:
+        games: Games to play.
+        record: Called at each turn with the moves of the players of the games still
+                playing, as (game, player, played cards) in game then seat order,
+                before they are placed.
+        freeze_gc: Whether to leave the objects created before the games are played
+                   out of the collections of the garbage collector, with
+                   `gc.freeze`, which speeds up playing many games at once. The
+                   objects frozen by the caller are unfrozen at the end too.
+    """
+    for game in games:
+        if game.budget is not None:
+            raise ValueError("Time budgets are not supported by lockstep games.")
+        if game.profiler is None:
+            game.deal_cards()
+        else:
+            game.profiler.time("deal", game.deal_cards)
+    if not freeze_gc:
+        play_lockstep(games, record)
+        return
+    # the many games kept alive make the collections of the garbage collector slower
+    # as they go, so the objects created so far are left out of them
+    gc.freeze()
+    try:
+        play_lockstep(games, record)
+    finally:
+        gc.unfreeze()
+
+
+def play_lockstep(
+    games: list[OGame],
+    record: "Callable[[list[tuple[OGame, OPlayer, Move]]], None] | None" = None,
+) -> None:
+    playing = list(games)
+    while playing:
+        groups: dict[type[OBackend], list[tuple[OGame, OPlayer]]] = {}
+        # rank of each player in game then seat order
+        ranks: dict[int, int] = {}
+        for game in playing:
+            game.begin_turn()
+            for player in game.players:
+                groups.setdefault(player.backend.__class__, []).append((game, player))
+                ranks[id(player)] = len(ranks)
+        moves = []
+        for backend_class, group in groups.items():
+            hands = [list(player.hand) for _, player in group]
+            piles = [
+                (
+                    OPileView(player.piles[0]),
+                    OPileView(player.piles[1]),
+                    OPileView(player.piles[2]),
+                )
+                for _, player in group
+            ]
+            backend = group[0][1].backend
+            profiler = group[0][0].profiler
+            start = time.perf_counter()
+            if backend_class.play_batch is OBackend.play_batch:
+                played_cards = []
+                for (game, player), hand, player_piles in zip(group, hands, piles):
+                    game.current_seat = game.players.index(player)
+                    played_cards.append(player.backend.play(hand, player_piles, game))
+            else:
+                for game, _ in group:
+                    game.current_seat = None
+                played_cards = backend.play_batch(
+                    hands, piles, [game for game, _ in group]
+                )
+            if profiler is not None:
+                profiler.add_play(backend, time.perf_counter() - start)
+            moves += [
+                (game, player, cards)
+                for (game, player), cards in zip(group, played_cards)
+            ]
+        # moves are committed in seat order, as histories and logs expect
+        moves.sort(key=lambda move: ranks[id(move[1])])
+        if record is not None:
+            record(moves)
+        for game, player, played_cards in moves:
+            player.commit(played_cards, game)
+        for game in playing:
+            game.end_turn()
+        playing = [game for game in playing if not game.finished]
+
+
+def derive_seeds(seed: int, count: int, offset: int = 0) -> list[int]:
+    """Derive independent 64-bit game seeds from a master seed.
+
+    The seed of a game only depends on the master seed and its index, so any game of
+    a large batch can be replayed alone.
+    """
+    # hashlib loads OpenSSL, which is slow to import
+    import hashlib
+
+    return [
+        int.from_bytes(
+            hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest(),
+            "little",
+        )
+        for index in range(offset, offset + count)
+    ]
 
 
 def create_deck() -> list[OCard]:
@@ -0,0 +1,249 @@
+"""Append-only binary log of played games.
+
+A log file starts with a header holding the number of players of its games and the
+names of the backends they can use. It is followed by fixed-size game records:
+
+- the game seed, as an unsigned 64-bit integer,
+- the index of the backend of each seat, one byte each,
+- the 15 turns of each seat, two cards per turn, each card packed in 16 bits as its
+  value (7 bits) and its pile index (3 for a discard) shifted by 7.
+
+Since records have a fixed size, logs are memory-mapped as NumPy structured arrays,
+and games can be re-scored in bulk without going through `OGame`.
+"""
+import os
+import struct
+
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+from ohanami.compact import CARD_COLORS
+from ohanami.game import OGame
+from ohanami.players import OBackend
+
+MAGIC = b"OHLOG"
+VERSION = 1
+TURNS = 15
+DISCARD = 3
+COLORS_TABLE = np.frombuffer(CARD_COLORS, dtype=np.uint8).astype(np.intp)
+
+
+def record_dtype(players: int) -> np.dtype:
+    """Get the dtype of the game records of a log."""
+    return np.dtype(
+        [
+            ("seed", "<u8"),
+            ("seats", "u1", (players,)),
+            ("moves", "<u2", (TURNS, players, 2)),
+        ]
+    )
+
+
+def read_header(file: BinaryIO) -> tuple[int, list[str]]:
+    """Read the header of a log, returning its number of players and backend names."""
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{file.name} is not an Ohanami game log.")
+    version, players, nbackends = struct.unpack("<BBB", file.read(3))
+    if version != VERSION:
+        raise ValueError(f"Unsupported game log version {version}.")
+    names = []
+    for _ in range(nbackends):
+        (length,) = struct.unpack("<B", file.read(1))
+        names.append(file.read(length).decode())
+    return players, names
+
+
+class OGameLogWriter:
+    """Appends finished games to a log, creating it if needed.
+
+    Games must record their history, see `OGame.history`.
+
+    Args:
+        path: Path of the log.
+        players: Number of players of the logged games.
+        backends: Backends the logged games can use.
+    """
+
+    def __init__(self, path: str, players: int, backends: list[type[OBackend]]) -> None:
+        names = [backend.__name__ for backend in backends]
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as file:
+                log_players, log_names = read_header(file)
+            if log_players != players:
+                raise ValueError(
+                    f"{path} logs {log_players}-player games, not {players}-player ones."
+                )
+            unknown = set(names) - set(log_names)
+            if unknown:
+                raise ValueError(f"Backends {', '.join(unknown)} unknown to {path}.")
+            names = log_names
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(MAGIC + struct.pack("<BBB", VERSION, players, len(names)))
+            for name in names:
+                encoded = name.encode()
+                self.file.write(struct.pack("<B", len(encoded)) + encoded)
+        self.players = players
+        self.backend_ids = {name: n_backend for n_backend, name in enumerate(names)}
+        self.record = struct.Struct(f"<Q{players}B{TURNS * players * 2}H")
+
+    def write(self, game: OGame) -> None:
+        """Append a finished game to the log."""
+        if game.seed is None or game.history is None:
+            raise ValueError("Only seeded games recording their history can be logged.")
+        self.file.write(
+            self.record.pack(
+                game.seed,
+                *[
+                    self.backend_ids[player.backend.__class__.__name__]
+                    for player in game.players
+                ],
+                *[
+                    value | (DISCARD if npile is None else npile) << 7
+                    for npile, value in game.history
+                ],
+            )
+        )
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "OGameLogWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class OGameLogReader:
+    """Memory-mapped view of a log.
+
+    A record being written at the end of the log is ignored.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self.players, self.backends = read_header(file)
+            offset = file.tell()
+        self.dtype = record_dtype(self.players)
+        count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        self.records: np.ndarray = (
+            np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+            if count
+            else np.zeros(0, dtype=self.dtype)
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(
+        self,
+    ) -> Iterator[tuple[int, list[str], list[list[tuple[int | None, int]]]]]:
+        """Lazily iterate over the games.
+
+        Yields:
+            The seed, the backend name of each seat, and the (pile, card value)
+            choices of each turn, in seat order.
+        """
+        for record in self.records:
+            moves = [
+                [
+                    (None if code >> 7 == DISCARD else int(code >> 7), int(code & 0x7F))
+                    for code in turn.reshape(-1)
+                ]
+                for turn in record["moves"]
+            ]
+            yield int(record["seed"]), [
+                self.backends[seat] for seat in record["seats"]
+            ], moves
+
+    def iter_scoreboards(self, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+        """Lazily compute the scoreboards of the games, by chunks of `chunk_size` games.
+
+        Games are scored from their moves only, with the rules of `OPile.add` and
+        `OPile.get_scores`.
+
+        Yields:
+            The score of each color (in `OColor` order) of each season of each seat,
+            of shape (games of the chunk, players, 3, 4).
+        """
+        for start in range(0, len(self), chunk_size):
+            yield score_moves(
+                np.asarray(self.records[start : start + chunk_size]["moves"])
+            )
+
+    def scoreboards(
+        self, chunk_size: int = 1_000_000, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Compute the scoreboard of each seat of each game, like `OPlayer.scores`.
+
+        Args:
+            chunk_size: Number of games scored at once, see `iter_scoreboards`.
+            out: Array of shape (games, players, 3, 4) the scoreboards are written
+                 to, such as a `np.memmap` for logs too large to score in memory,
+                 allocated if None.
+        """
+        if out is None:
+            out = np.zeros((len(self), self.players, 3, 4), dtype=np.int32)
+        start = 0
+        for boards in self.iter_scoreboards(chunk_size):
+            out[start : start + len(boards)] = boards
+            start += len(boards)
+        return out
+
+    def scores(
+        self, chunk_size: int = 1_000_000, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Compute the final score of each seat of each game, of shape (games, players).
+
+        Args:
+            chunk_size: Number of games scored at once, see `iter_scoreboards`.
+            out: Array the scores are written to, allocated if None.
+        """
+        if out is None:
+            out = np.zeros((len(self), self.players), dtype=np.int32)
+        start = 0
+        for boards in self.iter_scoreboards(chunk_size):
+            out[start : start + len(boards)] = boards.sum(axis=(2, 3))
+            start += len(boards)
+        return out
+
+
+def score_moves(moves: np.ndarray) -> np.ndarray:
+    """Score games from their packed moves, of shape (games, 15, players, 2).
+
+    Returns:
+        The scoreboards of the games, of shape (games, players, 3, 4).
+    """
+    games, _, players, _ = moves.shape
+    values = (moves & 0x7F).astype(np.int16)
+    piles = (moves >> 7).astype(np.intp)
+    mins = np.full((games, players, 4), 121, dtype=np.int16)
+    maxs = np.zeros((games, players, 4), dtype=np.int16)
+    # the fourth pile gathers the discards and is never scored
+    counts = np.zeros((games, players, 4, 4), dtype=np.int32)
+    boards = np.zeros((games, players, 3, 4), dtype=np.int32)
+    rows = np.arange(games)[:, None]
+    seats = np.arange(players)[None, :]
+    for turn in range(TURNS):
+        for n_card in range(2):
+            value, pile = values[:, turn, :, n_card], piles[:, turn, :, n_card]
+            pile_min, pile_max = mins[rows, seats, pile], maxs[rows, seats, pile]
+            placed = (pile != DISCARD) & ((value < pile_min) | (value > pile_max))
+            pile = np.where(placed, pile, DISCARD)
+            mins[rows, seats, pile] = np.where(placed, np.minimum(pile_min, value), 121)
+            maxs[rows, seats, pile] = np.where(placed, np.maximum(pile_max, value), 0)
+            counts[rows, seats, pile, COLORS_TABLE[value]] += placed
+        if turn % 5 == 4:
+            season = turn // 5
+            colors = counts[:, :, :3].sum(axis=2)
+            boards[:, :, season, 0] = 3 * colors[..., 0]
+            if season >= 1:
+                boards[:, :, season, 1] = 4 * colors[..., 1]
+            if season == 2:
+                boards[:, :, season, 2] = 7 * colors[..., 2]
+                sakura = counts[:, :, :3, 3]
+                boards[:, :, season, 3] = (sakura * (sakura + 1) // 2).sum(axis=2)
+    return boards
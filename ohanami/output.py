@@ -0,0 +1,104 @@
+"""Output sinks of finished games.
+
+A game writes itself to its sink when it concludes, see `OGame.output`. Games without
+a sink do not format anything.
+"""
+import json
+import sys
+
+from typing import (
+    TYPE_CHECKING,
+    TextIO,
+)
+
+if TYPE_CHECKING:
+    from ohanami.game import OGame
+
+
+class OOutput:
+    def write(self, game: "OGame") -> None:
+        """Write a finished game."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+class OTableOutput(OOutput):
+    """Prints the scores table of every game, like `OGame.display_scores`.
+
+    Args:
+        stream: Stream to write to, the current standard output if None.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream
+
+    def write(self, game: "OGame") -> None:
+        print("\n# Concluding", file=self.stream or sys.stdout)
+        print(game.format_scores(), file=self.stream or sys.stdout)
+
+
+class OBufferedOutput(OTableOutput):
+    """Prints the scores tables by blocks of games rather than one by one.
+
+    Args:
+        stream: Stream to write to, the current standard output if None.
+        size: Number of games per block.
+    """
+
+    def __init__(self, stream: TextIO | None = None, size: int = 100) -> None:
+        super().__init__(stream)
+        self.size = size
+        self.tables: list[str] = []
+
+    def write(self, game: "OGame") -> None:
+        self.tables.append(game.format_scores())
+        if len(self.tables) >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.tables:
+            (self.stream or sys.stdout).write("\n".join(self.tables) + "\n")
+            self.tables = []
+
+
+class OJsonOutput(OOutput):
+    """Writes every game as a JSON line, for later analysis.
+
+    Each line holds the seed of the game and, for each seat, the name and backend of
+    the player, its scores per season and color, its total score and its number of
+    discarded cards.
+
+    Args:
+        stream: Stream to write to.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def write(self, game: "OGame") -> None:
+        self.stream.write(
+            json.dumps(
+                {
+                    "seed": game.seed,
+                    "players": [
+                        {
+                            "name": player.name,
+                            "backend": player.backend.__class__.__name__,
+                            "scores": [
+                                {color.value: score for color, score in season.items()}
+                                for season in player.scores
+                            ],
+                            "score": player.score,
+                            "discarded": len(player.discarded_cards),
+                        }
+                        for player in game.players
+                    ],
+                }
+            )
+            + "\n"
+        )
+
+    def flush(self) -> None:
+        self.stream.flush()
@@ -1,9 +1,15 @@
-from ohanami.players.base import OBackend
+from ohanami.players.base import (
+    OAsyncAdapter,
+    OAsyncBackend,
+    OBackend,
+)
+from ohanami.players.endgame import EndgameSolver
 from ohanami.players.heuristics import (
     AlwaysSmall,
     BetterBeSafe,
     Centrist,
 )
+from ohanami.players.montecarlo import MonteCarlo
 from ohanami.players.random import RandomRetardPlayer
 
 AVAILABLE_PLAYERS: list[type[OBackend]] = [
@@ -11,4 +17,5 @@ AVAILABLE_PLAYERS: list[type[OBackend]] = [
     AlwaysSmall,
     BetterBeSafe,
     Centrist,
+    MonteCarlo,
 ]
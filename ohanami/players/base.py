@@ -16,6 +16,36 @@ class OBackend:
     ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
         raise NotImplementedError
 
+    def play_batch(
+        self,
+        hands: "list[list[OCard]]",
+        piles: "list[tuple[OPile, OPile, OPile]]",
+        games: "list[OGame]",
+    ) -> "list[tuple[tuple[int | None, OCard], tuple[int | None, OCard]]]":
+        """Play the moves of several players of this class at once.
+
+        Called by `ohanami.game.play_games` on one instance for all the players of
+        the class, so overriding it is only suitable for backends whose moves do not
+        depend on their instance. Loops over `play` by default.
+        """
+        return [
+            self.play(cards, player_piles, game)
+            for cards, player_piles, game in zip(hands, piles, games)
+        ]
+
+    def close(self) -> None:
+        """Release the resources of the backend, such as worker processes.
+
+        The backend may still play afterwards, acquiring them again.
+        """
+
+    @staticmethod
+    def get_seat(game: "OGame") -> int:
+        """Get the seat of the player whose move is asked, see `OGame.current_seat`."""
+        if game.current_seat is None:
+            raise ValueError("The game does not tell which seat is asked its move.")
+        return game.current_seat
+
     @staticmethod
     def get_closest_pile(
         card: "OCard", piles: "tuple[OPile, OPile, OPile]", sign: int = 0
@@ -35,7 +65,7 @@ class OBackend:
         best_pile = None
         max_diff = 120
         for n_pile, pile in enumerate(piles):
-            if not pile.cards:  # empty piles are the best
+            if pile.max == 0:  # empty piles are the best
                 return n_pile
             if sign <= 0:
                 diff = pile.min - card.value
@@ -46,3 +76,57 @@ class OBackend:
                 if diff > 0 and diff < max_diff:
                     max_diff, best_pile = diff, n_pile
         return best_pile
+
+
+class OAsyncBackend(OBackend):
+    """Backend whose moves are awaited, for backends waiting on I/O.
+
+    Games await them in their asynchronous loop, see `OGame.start_async`, and call
+    them through `asyncio.run` otherwise.
+    """
+
+    async def play_async(
+        self,
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
+        raise NotImplementedError
+
+    def play(
+        self,
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
+        # asyncio is slow to import, so it is only loaded by asynchronous backends
+        import asyncio
+
+        return asyncio.run(self.play_async(cards, piles, game))
+
+
+class OAsyncAdapter(OAsyncBackend):
+    """Awaitable wrapper of a synchronous backend.
+
+    Args:
+        backend: Wrapped backend.
+        thread: If True, moves run in a worker thread rather than blocking the
+                event loop, which only pays off for backends releasing the GIL.
+    """
+
+    def __init__(self, backend: OBackend, thread: bool = False) -> None:
+        self.backend = backend
+        self.thread = thread
+        self.noob = backend.noob
+
+    async def play_async(
+        self,
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
+        if self.thread:
+            import asyncio
+
+            return await asyncio.to_thread(self.backend.play, cards, piles, game)
+        return self.backend.play(cards, piles, game)
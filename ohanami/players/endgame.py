@@ -0,0 +1,349 @@
+import random
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from ohanami.players.base import OBackend
+from ohanami.players.heuristics import Centrist
+from ohanami.players.montecarlo import determinize
+
+if TYPE_CHECKING:
+    from ohanami.game import OCard, OGame, OPile
+
+Move = tuple[tuple[int | None, "OCard"], tuple[int | None, "OCard"]]
+# Pile as its min, max and number of cards of each color, in `OColor` order
+PileState = tuple[int, int, int, int, int, int]
+PilesState = tuple[PileState, PileState, PileState]
+# Move as (pile, card value) pairs
+ValueMove = tuple[tuple[int | None, int], tuple[int | None, int]]
+
+
+@dataclass
+class OSolverStats:
+    """Counters of the searches of a solver."""
+
+    searches: int = 0
+    # Positions reached, including those found in the transposition table
+    nodes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    seconds: float = 0.0
+
+    @property
+    def node_rate(self) -> float:
+        """Positions reached per second."""
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the lookups of the transposition table finding their position."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class OTranspositionTable:
+    """Best values and moves of positions, evicting the least recently used beyond
+    `size`."""
+
+    def __init__(self, size: int, stats: OSolverStats) -> None:
+        self.size = size
+        self.stats = stats
+        self.values: OrderedDict[tuple, tuple[int, ValueMove]] = OrderedDict()
+
+    def get(self, key: tuple) -> tuple[int, ValueMove] | None:
+        value = self.values.get(key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self.values.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: tuple[int, ValueMove]) -> None:
+        self.values[key] = value
+        if len(self.values) > self.size:
+            self.values.popitem(last=False)
+            self.stats.evictions += 1
+
+
+def pile_state(pile: "OPile") -> PileState:
+    from ohanami.compact import COLORS
+
+    water, leaf, stone, sakura = (pile.get_color(color) for color in COLORS)
+    return pile.min, pile.max, water, leaf, stone, sakura
+
+
+def place(pile: PileState, value: int) -> PileState | None:
+    """Place a card on a pile, None if the card does not fit."""
+    from ohanami.compact import CARD_COLORS
+
+    low, high, *counts = pile
+    if value < low:
+        low, high = value, high or value
+    elif value > high:
+        high = value
+    else:
+        return None
+    counts[CARD_COLORS[value]] += 1
+    water, leaf, stone, sakura = counts
+    return low, high, water, leaf, stone, sakura
+
+
+def replace_pile(piles: PilesState, n_pile: int, pile: PileState) -> PilesState:
+    new = list(piles)
+    new[n_pile] = pile
+    return (new[0], new[1], new[2])
+
+
+def value_of(piles: PilesState, season: int) -> int:
+    """Score the piles would bring from a season to the end of the game."""
+    score = 0
+    for _, _, water, leaf, stone, sakura in piles:
+        score += 3 * water * (3 - season) + 4 * leaf * (3 - max(season, 1))
+        score += 7 * stone + sakura * (sakura + 1) // 2
+    return score
+
+
+def hand_values(hand: int) -> list[int]:
+    values = []
+    while hand:
+        low = hand & -hand
+        values.append(low.bit_length() - 1)
+        hand ^= low
+    return values
+
+
+class EndgameSolver(OBackend):
+    """Solves the last turns of the game exactly, over samples of the hidden hands.
+
+    In the third season, once its hand holds at most `exact_below` cards, the solver
+    searches every pair of cards and piles of every hand it will hold until the end
+    of the game, and plays the move leading to the best final score of its piles.
+    Other moves are played by `fallback`: in the first two seasons, the value of the
+    piles at the end of the season ignores how widening their min and max limits the
+    cards of the next seasons, and searching them loses to Centrist.
+
+    The solver only uses what its player knows: the hands of the opponents are
+    drawn `samples` times, from the game generator, as MonteCarlo draws them, see
+    `ohanami.players.montecarlo.determinize`, and each move is valued by its mean
+    over the samples. In games tracking cards, see `OGame.tracker`, the hands the
+    player passed on are drawn among their cards, so that only the cards discarded
+    since are unknown. Exact search is limited to the turns from which the player
+    has held every hand of the season, that is hands of at most `12 - 2 * players`
+    cards, whatever `exact_below`.
+
+    Opponents are assumed to play as `opponent_backend`, on their hand sorted by
+    value. Positions are kept in a transposition table keyed by the season, the seat
+    of the player, the hands, as masks of card values, and the min, max and color
+    counts of the piles.
+
+    Args:
+        exact_below: Largest hand size searched exactly.
+        fallback: Backend playing the moves of larger hands.
+        opponent_backend: Backend the opponents are assumed to play as, which is not
+                          given the game.
+        samples: Number of draws of the hidden hands per move.
+        table_size: Maximum number of positions of the transposition table.
+    """
+
+    def __init__(
+        self,
+        exact_below: int = 4,
+        fallback: type[OBackend] = Centrist,
+        opponent_backend: type[OBackend] = Centrist,
+        samples: int = 4,
+        table_size: int = 1_000_000,
+    ) -> None:
+        self.exact_below = exact_below
+        self.fallback = fallback()
+        self.opponent = opponent_backend()
+        self.samples = samples
+        self.noob = self.fallback.noob
+        self.stats = OSolverStats()
+        self.table = OTranspositionTable(table_size, self.stats)
+        # Moves of the opponents by hand and piles
+        self.opponent_moves: OrderedDict[tuple, tuple] = OrderedDict()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["table"] = OTranspositionTable(self.table.size, self.stats)
+        state["opponent_moves"] = OrderedDict()
+        return state
+
+    def play(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
+    ) -> Move:
+        from ohanami.game import OSeason
+
+        if game.current_season is not OSeason.THIRD or len(cards) > min(
+            self.exact_below, 12 - 2 * len(game.players)
+        ):
+            return self.fallback.play(cards, piles, game)
+        start = time.perf_counter()
+        self.stats.searches += 1
+        self.season = game.current_season.value
+        self.n_player = n_player = self.get_seat(game)
+        states = [
+            (pile_state(pile[0]), pile_state(pile[1]), pile_state(pile[2]))
+            for pile in (player.piles for player in game.players)
+        ]
+        states[n_player] = (
+            pile_state(piles[0]),
+            pile_state(piles[1]),
+            pile_state(piles[2]),
+        )
+        # players holding as many cards as this one have not played this turn yet
+        pending = [
+            n_other
+            for n_other, player in enumerate(game.players)
+            if n_other != n_player and len(player.hand) == len(cards)
+        ]
+        rng = random.Random(game.rng.getrandbits(64))
+        sums: dict[ValueMove, int] = {}
+        for _ in range(self.samples):
+            sample = determinize(game, n_player, rng)
+            hands = [
+                sum(1 << card.value for card in player.hand)
+                for player in sample.players
+            ]
+            hands[n_player] = sum(1 << card.value for card in cards)
+            played_hands, played_states = self.play_opponents(
+                hands, list(states), pending
+            )
+            for value, move in self.evaluate(tuple(played_hands), tuple(played_states)):
+                sums[move] = sums.get(move, 0) + value
+        self.stats.seconds += time.perf_counter() - start
+        first, second = max(sums, key=lambda move: sums[move])
+        by_value = {card.value: card for card in cards}
+        return (first[0], by_value[first[1]]), (second[0], by_value[second[1]])
+
+    def solve(self, hands: tuple[int, ...], states: tuple[PilesState, ...]) -> int:
+        """Get the best value of the player from a position at the start of a turn."""
+        self.stats.nodes += 1
+        if not hands[self.n_player]:
+            return value_of(states[self.n_player], self.season)
+        opponents = [
+            n_other for n_other in range(len(hands)) if n_other != self.n_player
+        ]
+        played_hands, played_states = self.play_opponents(
+            list(hands), list(states), opponents
+        )
+        return self.search(tuple(played_hands), tuple(played_states))[0]
+
+    def search(
+        self, hands: tuple[int, ...], states: tuple[PilesState, ...]
+    ) -> tuple[int, ValueMove]:
+        """Get the best value and move of the player once the opponents have played."""
+        key = (self.season, self.n_player, hands, states)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        best = max(self.evaluate(hands, states), key=lambda scored: scored[0])
+        self.table.put(key, best)
+        return best
+
+    def evaluate(
+        self, hands: tuple[int, ...], states: tuple[PilesState, ...]
+    ) -> list[tuple[int, ValueMove]]:
+        """Get the value of each move of the player once the opponents have played."""
+        values = []
+        for move, hand, own_states in self.get_moves(
+            hands[self.n_player], states[self.n_player]
+        ):
+            child_hands = list(hands)
+            child_hands[self.n_player] = hand
+            child_states = list(states)
+            child_states[self.n_player] = own_states
+            values.append(
+                (self.solve(self.rotate(child_hands), tuple(child_states)), move)
+            )
+        return values
+
+    def get_moves(
+        self, hand: int, piles: PilesState
+    ) -> list[tuple[ValueMove, int, PilesState]]:
+        """Get the moves of a hand leading to distinct piles.
+
+        Returns:
+            The moves, with the hand and piles they leave.
+        """
+        values = hand_values(hand)
+        moves = {}
+        for n_first, first in enumerate(values):
+            for first_pile in (0, 1, 2, None):
+                first_piles = piles
+                if first_pile is not None:
+                    pile = place(piles[first_pile], first)
+                    if pile is None:
+                        continue
+                    first_piles = replace_pile(piles, first_pile, pile)
+                for n_second, second in enumerate(values):
+                    if n_second == n_first:
+                        continue
+                    for second_pile in (0, 1, 2, None):
+                        # order only matters when both cards go on the same pile
+                        if n_second < n_first and (
+                            first_pile != second_pile or first_pile is None
+                        ):
+                            continue
+                        second_piles = first_piles
+                        if second_pile is not None:
+                            pile = place(first_piles[second_pile], second)
+                            if pile is None:
+                                continue
+                            second_piles = replace_pile(first_piles, second_pile, pile)
+                        left = hand & ~(1 << first) & ~(1 << second)
+                        moves.setdefault(
+                            (left, second_piles),
+                            ((first_pile, first), (second_pile, second)),
+                        )
+        return [(move, left, piles) for (left, piles), move in moves.items()]
+
+    def play_opponents(
+        self,
+        hands: list[int],
+        states: list[PilesState],
+        opponents: list[int],
+    ) -> tuple[list[int], list[PilesState]]:
+        """Play the moves of opponents, as `opponent_backend` would."""
+        from ohanami.compact import CARDS, CompactPile
+
+        for n_other in opponents:
+            key = (hands[n_other], states[n_other])
+            played = self.opponent_moves.get(key)
+            if played is None:
+                cards = [CARDS[value] for value in hand_values(hands[n_other])]
+                piles = []
+                for low, high, *counts in states[n_other]:
+                    pile = CompactPile()
+                    pile.min, pile.max, pile.counts = low, high, counts
+                    pile.mask = 0
+                    piles.append(pile)
+                move = self.opponent.play(
+                    cards, (piles[0], piles[1], piles[2]), None  # type: ignore[arg-type]
+                )
+                hand, own_states = hands[n_other], states[n_other]
+                for n_pile, card in move:
+                    hand &= ~(1 << card.value)
+                    if n_pile is None:
+                        continue
+                    pile_after = place(own_states[n_pile], card.value)
+                    if pile_after is None:
+                        # invalid placements are discarded, as for noob backends
+                        continue
+                    own_states = replace_pile(own_states, n_pile, pile_after)
+                played = (hand, own_states)
+                self.opponent_moves[key] = played
+                if len(self.opponent_moves) > self.table.size:
+                    self.opponent_moves.popitem(last=False)
+            hands[n_other], states[n_other] = played
+        return hands, states
+
+    def rotate(self, hands: list[int]) -> tuple[int, ...]:
+        """Pass the hands as `OGame.rotate_hands`."""
+        if self.season == 1:
+            return tuple(hands[1:] + hands[:1])
+        return tuple(hands[-1:] + hands[:-1])
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
 from ohanami.players.base import OBackend
+from ohanami.players.moves import OMoveIndex
 
 if TYPE_CHECKING:
     from ohanami.game import OCard, OGame, OPile
@@ -49,49 +50,30 @@ class BetterBeSafe(OBackend):
     def play(
         self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
     ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
-        # first card
-        smallest_distance = 122
-        first_card = None
-        first_pile_i = None
-        for card in cards:
-            for i in range(0, 3):  # loop on the 3 piles
-                if card.value > piles[i].max:
-                    distance = card.value - piles[i].max
-                elif card.value < piles[i].min:
-                    distance = piles[i].min - card.value
-                else:
-                    distance = 122
-                if distance < smallest_distance:
-                    first_card = card
-                    first_pile_i = i
-        if first_pile_i is None:
+        index = OMoveIndex(cards, piles)
+        # first card: the last one of the hand having a legal pile, on its last pile
+        playable = index.playable
+        first_card = next(
+            (card for card in reversed(cards) if playable >> card.value & 1), None
+        )
+        if first_card is None:
             return (
                 (None, cards[0]),
                 (None, cards[1]),
             )
-        assert first_card is not None
-        piles[first_pile_i].add(first_card)
+        first_pile_i = index.pile_mask(first_card.value).bit_length() - 1
+        index.place(first_card.value, first_pile_i)
 
         # second card, same thing
-        smallest_distance = 122
-        second_card = None
+        playable = index.playable
+        second_card = next(
+            (card for card in reversed(cards) if playable >> card.value & 1), None
+        )
         second_pile_i = None
-        for card in cards:
-            if card is first_card:
-                continue
-            for i in range(0, 3):
-                if card.value > piles[i].max:
-                    distance = card.value - piles[i].max
-                elif card.value < piles[i].min:
-                    distance = piles[i].min - card.value
-                else:
-                    distance = 122
-                if distance < smallest_distance:
-                    second_card = card
-                    second_pile_i = i
-
         if second_card is None:
             second_card = next(card for card in cards if card is not first_card)
+        else:
+            second_pile_i = index.pile_mask(second_card.value).bit_length() - 1
         # return the two selected cards
         return (
             (first_pile_i, first_card),
@@ -106,6 +88,8 @@ class Centrist(OBackend):
         self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
     ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
         cards = [card for card in sorted(cards, key=lambda card: abs(card.value - 60))]
+        # usually settled by its first cards, so building a move index costs more
+        # than it saves
         selected_cards: list[tuple[int | None, OCard]] = []
         for card in cards:
             best_pile = self.get_closest_pile(card, piles)
@@ -0,0 +1,265 @@
+import math
+import random
+import time
+
+from typing import TYPE_CHECKING
+
+from ohanami.players.base import OBackend
+from ohanami.players.heuristics import Centrist
+from ohanami.players.moves import OMoveIndex
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ohanami.game import OCard, OGame, OPile
+
+Move = tuple[tuple[int | None, "OCard"], tuple[int | None, "OCard"]]
+
+
+class MonteCarlo(OBackend):
+    """Picks its move by flat Monte Carlo rollouts over determinized games.
+
+    Hidden cards (opponents hands and the remaining deck) are redistributed at
+    random among the cards not seen by the player, then the game is played to its
+    end by `rollout_backend`. Candidate moves are selected with UCB1.
+
+    Args:
+        rollouts: Maximum number of rollouts per move, unlimited if None.
+        budget_ms: Maximum time spent per move in milliseconds, unlimited if None.
+        candidates: Number of candidate moves kept, ranked by the gaps they leave.
+        workers: Number of processes sharing the rollouts of a move.
+        rollout_backend: Backend playing every seat during the rollouts.
+        exploration: UCB1 exploration constant, in score points.
+
+    The hidden cards are sampled from generators seeded by the game generator.
+    """
+
+    def __init__(
+        self,
+        rollouts: int | None = 64,
+        budget_ms: float | None = None,
+        candidates: int = 8,
+        workers: int = 1,
+        rollout_backend: type[OBackend] = Centrist,
+        exploration: float = 20.0,
+    ) -> None:
+        if rollouts is None and budget_ms is None:
+            raise ValueError("MonteCarlo needs a rollouts or a time budget.")
+        self.rollouts = rollouts
+        self.budget_ms = budget_ms
+        self.candidates = candidates
+        self.workers = workers
+        self.rollout_backend = rollout_backend
+        self.exploration = exploration
+        self._executor: "ProcessPoolExecutor | None" = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def play(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
+    ) -> Move:
+        moves = self.get_candidates(cards, piles)
+        if len(moves) == 1:
+            return moves[0]
+        n_player = self.get_seat(game)
+        if self.workers <= 1:
+            sums, counts = search(
+                game,
+                n_player,
+                moves,
+                self.rollout_backend,
+                self.rollouts,
+                self.budget_ms,
+                self.exploration,
+                game.rng.getrandbits(64),
+            )
+        else:
+            if self._executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            rollouts = (
+                None
+                if self.rollouts is None
+                else math.ceil(self.rollouts / self.workers)
+            )
+            futures = [
+                self._executor.submit(
+                    search,
+                    game,
+                    n_player,
+                    moves,
+                    self.rollout_backend,
+                    rollouts,
+                    self.budget_ms,
+                    self.exploration,
+                    game.rng.getrandbits(64),
+                )
+                for _ in range(self.workers)
+            ]
+            sums, counts = [0.0 for _ in moves], [0 for _ in moves]
+            for future in futures:
+                worker_sums, worker_counts = future.result()
+                for n_move in range(len(moves)):
+                    sums[n_move] += worker_sums[n_move]
+                    counts[n_move] += worker_counts[n_move]
+        best = max(
+            range(len(moves)),
+            key=lambda n_move: sums[n_move] / counts[n_move] if counts[n_move] else 0,
+        )
+        return moves[best]
+
+    def close(self) -> None:
+        """Shut down the worker processes, if any."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def get_candidates(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]"
+    ) -> list[Move]:
+        """Get the candidate moves leaving the smallest gaps on the piles.
+
+        Discarding a card counts as the largest gap and an empty pile as a gap of 20.
+        """
+        index = OMoveIndex(cards, piles)
+        scored_moves: list[tuple[int, Move]] = []
+        for n_first, first_card in enumerate(cards):
+            for first_pile, first_gap in self.get_placements(first_card, index):
+                trial_index = index.copy()
+                if first_pile is None:
+                    trial_index.remove(first_card.value)
+                else:
+                    trial_index.place(first_card.value, first_pile)
+                for n_second, second_card in enumerate(cards):
+                    if n_second == n_first:
+                        continue
+                    for second_pile, second_gap in self.get_placements(
+                        second_card, trial_index
+                    ):
+                        # order only matters when both cards go on the same pile
+                        if n_second < n_first and (
+                            first_pile != second_pile or first_pile is None
+                        ):
+                            continue
+                        scored_moves.append(
+                            (
+                                first_gap + second_gap,
+                                (
+                                    (first_pile, first_card),
+                                    (second_pile, second_card),
+                                ),
+                            )
+                        )
+        scored_moves.sort(key=lambda scored_move: scored_move[0])
+        return [move for _, move in scored_moves[: self.candidates]]
+
+    @staticmethod
+    def get_placements(
+        card: "OCard", index: OMoveIndex
+    ) -> list[tuple[int | None, int]]:
+        """Get the legal piles of a card with their gaps, None for a discard."""
+        placements: list[tuple[int | None, int]] = [(None, 121)]
+        for _, n_pile, _, gap in index.placements(card.value):
+            placements.append((n_pile, 20 if index.is_empty(n_pile) else gap))
+        return placements
+
+
+def determinize(game: "OGame", n_player: int, rng: random.Random) -> "OGame":
+    """Clone a game, redistributing at random the cards unseen by a player.
+
+    In games tracking cards, the hands the player passed on are drawn among their
+    cards, see `ohanami.tracking.OCardTracker.sample`.
+    """
+    from ohanami.game import create_deck
+
+    clone = game.clone(rng)
+    if clone.tracker is not None:
+        hands, clone.remaining_deck = clone.tracker.sample(n_player, rng)
+        for n_other, (other, hand) in enumerate(zip(clone.players, hands)):
+            if n_other != n_player:
+                other.hand = hand
+        # the hands of the clone are made up, so it is no longer tracked
+        clone.tracker = None
+        return clone
+    player = clone.players[n_player]
+    seen = {card.value for card in player.hand}
+    seen.update(card.value for card in player.discarded_cards)
+    for other in clone.players:
+        for pile in other.piles:
+            seen.update(card.value for card in pile.cards)
+    unseen = [card for card in create_deck() if card.value not in seen]
+    rng.shuffle(unseen)
+    for n_other, other in enumerate(clone.players):
+        if n_other == n_player:
+            continue
+        other.hand, unseen = unseen[: len(other.hand)], unseen[len(other.hand) :]
+    clone.remaining_deck = unseen[: len(clone.remaining_deck)]
+    return clone
+
+
+def rollout(
+    game: "OGame", n_player: int, move: Move, backend: OBackend, rng: random.Random
+) -> int:
+    """Play a move on a determinized game and finish it, returning the final score."""
+    game = determinize(game, n_player, rng)
+    for player in game.players:
+        player.backend = backend
+    # players still holding as many cards as this one have not played this turn
+    hand_size = len(game.players[n_player].hand)
+    pending = [
+        player
+        for n_other, player in enumerate(game.players)
+        if n_other != n_player and len(player.hand) == hand_size
+    ]
+    game.apply_move(n_player, move)
+    for player in pending:
+        player.play(game)
+    game.rotate_hands()
+    game.current_turn = 5 - hand_size // 2 + 1
+    if game.current_turn == 5:
+        game.go_next_season()
+    while not game.finished:
+        game.turn()
+    return game.players[n_player].score
+
+
+def search(
+    game: "OGame",
+    n_player: int,
+    moves: list[Move],
+    rollout_backend: type[OBackend],
+    rollouts: int | None,
+    budget_ms: float | None,
+    exploration: float,
+    seed: int,
+) -> tuple[list[float], list[int]]:
+    """Run UCB1 rollouts over candidate moves within a budget.
+
+    Returns:
+        The sum of the final scores and the number of rollouts of each move.
+    """
+    rng = random.Random(seed)
+    backend = rollout_backend()
+    sums = [0.0 for _ in moves]
+    counts = [0 for _ in moves]
+    deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+    iteration = 0
+    while (rollouts is None or iteration < rollouts) and (
+        deadline is None or time.perf_counter() < deadline
+    ):
+        iteration += 1
+        if iteration <= len(moves):
+            n_move = iteration - 1
+        else:
+            n_move = max(
+                range(len(moves)),
+                key=lambda n_move: sums[n_move] / counts[n_move]
+                + exploration * math.sqrt(math.log(iteration) / counts[n_move]),
+            )
+        sums[n_move] += rollout(game, n_player, moves[n_move], backend, rng)
+        counts[n_move] += 1
+    return sums, counts
@@ -0,0 +1,136 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ohanami.game import OCard, OPile
+
+# Bit of each card value, and masks of the values strictly below and above it
+BITS = tuple(1 << value for value in range(122))
+BELOW = tuple(BITS[value] - 2 if value else 0 for value in range(122))
+ABOVE = tuple(((1 << 121) - 1) & ~((BITS[value] << 1) - 1) for value in range(122))
+
+
+# Legal placement of a card: card, pile index, True if placed above the maximum of
+# the pile (always on empty piles) and distance to the end of the pile (the card
+# value on empty piles). Plain tuples are several times cheaper to build than named
+# ones, which matters as placements are listed on every move.
+OPlacement = tuple["OCard", int, bool, int]
+
+
+class OMoveIndex:
+    """Legal placements of a hand on a set of piles.
+
+    The piles bounds are read once, and the hand is kept as a 121-bit mask indexed
+    by card value. For each pile, the cards that can be placed below its minimum
+    and above its maximum are kept as two masks built from precomputed tables, so
+    that checking whether a card, or any card, can be played takes a few bitwise
+    operations. Placing a card only updates the masks of its pile.
+    """
+
+    __slots__ = ("cards", "hand", "mins", "maxs", "bottoms", "tops")
+
+    def __init__(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]"
+    ) -> None:
+        self.cards = {card.value: card for card in cards}
+        hand = 0
+        for value in self.cards:
+            hand |= BITS[value]
+        self.hand = hand
+        self.mins = [piles[0].min, piles[1].min, piles[2].min]
+        self.maxs = [piles[0].max, piles[1].max, piles[2].max]
+        self.bottoms = [hand & BELOW[value] for value in self.mins]
+        self.tops = [hand & ABOVE[value] for value in self.maxs]
+
+    def copy(self) -> "OMoveIndex":
+        index = OMoveIndex.__new__(OMoveIndex)
+        index.cards = self.cards
+        index.hand = self.hand
+        index.mins = list(self.mins)
+        index.maxs = list(self.maxs)
+        index.bottoms = list(self.bottoms)
+        index.tops = list(self.tops)
+        return index
+
+    @property
+    def playable(self) -> int:
+        """Mask of the cards having at least one legal pile."""
+        tops, bottoms = self.tops, self.bottoms
+        return tops[0] | tops[1] | tops[2] | bottoms[0] | bottoms[1] | bottoms[2]
+
+    def is_empty(self, n_pile: int) -> bool:
+        return self.maxs[n_pile] == 0
+
+    def pile_mask(self, value: int) -> int:
+        """Mask of the legal piles of a card, bit i being set if pile i is legal."""
+        bit, tops, bottoms = BITS[value], self.tops, self.bottoms
+        return (
+            (1 if (tops[0] | bottoms[0]) & bit else 0)
+            | (2 if (tops[1] | bottoms[1]) & bit else 0)
+            | (4 if (tops[2] | bottoms[2]) & bit else 0)
+        )
+
+    def gap(self, value: int, n_pile: int) -> int:
+        """Distance between a card and the end of a pile it can be placed on."""
+        if value > self.maxs[n_pile]:
+            return value - self.maxs[n_pile]
+        return self.mins[n_pile] - value
+
+    def placements(self, value: int | None = None) -> list[OPlacement]:
+        """Get the legal placements of a card, or of the whole hand if None.
+
+        Placements are sorted in hand order, then by pile index.
+        """
+        mins, maxs = self.mins, self.maxs
+        playable = self.playable
+        values = self.cards if value is None else (value,)
+        placements = []
+        for value in values:
+            if not playable & BITS[value]:
+                continue
+            card = self.cards[value]
+            for n_pile in range(3):
+                if value > maxs[n_pile]:
+                    placements.append((card, n_pile, True, value - maxs[n_pile]))
+                elif value < mins[n_pile]:
+                    placements.append((card, n_pile, False, mins[n_pile] - value))
+        return placements
+
+    def closest_pile(self, value: int) -> int | None:
+        """Get the closest legal pile of a card, like `OBackend.get_closest_pile`."""
+        maxs = self.maxs
+        if 0 in maxs:  # empty piles are the best
+            return maxs.index(0)
+        mins = self.mins
+        best_pile = None
+        max_diff = 120
+        for n_pile in range(3):
+            diff = mins[n_pile] - value
+            if diff <= 0:
+                diff = value - maxs[n_pile]
+                if diff <= 0:
+                    continue
+            if diff < max_diff:
+                max_diff, best_pile = diff, n_pile
+        return best_pile
+
+    def place(self, value: int, n_pile: int) -> None:
+        """Place a card of the hand on a pile it fits on."""
+        self.remove(value)
+        if value < self.mins[n_pile]:
+            self.mins[n_pile] = value
+            self.bottoms[n_pile] = self.hand & BELOW[value]
+        if value > self.maxs[n_pile]:
+            self.maxs[n_pile] = value
+            self.tops[n_pile] = self.hand & ABOVE[value]
+
+    def remove(self, value: int) -> None:
+        """Remove a card from the hand."""
+        bit = ~BITS[value]
+        self.hand &= bit
+        tops, bottoms = self.tops, self.bottoms
+        tops[0] &= bit
+        tops[1] &= bit
+        tops[2] &= bit
+        bottoms[0] &= bit
+        bottoms[1] &= bit
+        bottoms[2] &= bit
@@ -1,5 +1,3 @@
-import random
-
 from typing import TYPE_CHECKING
 
 from ohanami.players.base import OBackend
@@ -14,9 +12,9 @@ class RandomRetardPlayer(OBackend):
     def play(
         self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: "OGame"
     ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
-        first_card = random.choice(cards)
+        first_card = game.rng.choice(cards)
         cards = [card for card in cards if card is not first_card]
         return (
-            (random.randint(0, 2), first_card),
-            (random.randint(0, 2), random.choice(cards)),
+            (game.rng.randint(0, 2), first_card),
+            (game.rng.randint(0, 2), game.rng.choice(cards)),
         )
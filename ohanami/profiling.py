@@ -0,0 +1,132 @@
+"""Opt-in timers of the phases of games and of the backends moves.
+
+Games only time themselves when given a profiler, see `OGame.profiler`, otherwise the
+cost of the instrumentation is a single attribute check per phase.
+"""
+import time
+
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+)
+
+from ohanami.players import OBackend
+
+if TYPE_CHECKING:
+    from ohanami.game import OCard, OGame, OPile
+
+# Phases of a game: dealing, backends moves, placing the played cards on the piles,
+# passing hands, scoring seasons and writing finished games to their output
+PHASES = ("deal", "play", "apply", "rotate", "score", "output")
+
+
+@dataclass
+class OTimer:
+    """Cumulative time and number of calls of a phase."""
+
+    calls: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mean_us(self) -> float:
+        return 1e6 * self.seconds / self.calls if self.calls else 0.0
+
+    def merge(self, other: "OTimer") -> None:
+        self.calls += other.calls
+        self.seconds += other.seconds
+
+
+@dataclass
+class OProfiler:
+    """Timers of each phase of the games, and of the moves of each backend."""
+
+    phases: dict[str, OTimer] = field(
+        default_factory=lambda: {phase: OTimer() for phase in PHASES}
+    )
+    backends: dict[type[OBackend], OTimer] = field(default_factory=dict)
+
+    def time(self, phase: str, function: Callable[..., Any], *args: Any) -> Any:
+        """Call a function, adding its duration to a phase."""
+        start = time.perf_counter()
+        result = function(*args)
+        timer = self.phases[phase]
+        timer.calls += 1
+        timer.seconds += time.perf_counter() - start
+        return result
+
+    def time_play(
+        self,
+        backend: OBackend,
+        play: "Callable[[list[OCard], tuple[OPile, OPile, OPile], OGame], Any]",
+        cards: "list[OCard]",
+        piles: "tuple[OPile, OPile, OPile]",
+        game: "OGame",
+    ) -> "tuple[tuple[int | None, OCard], tuple[int | None, OCard]]":
+        """Get a move through `play`, timed both as a play phase and per backend."""
+        start = time.perf_counter()
+        played_cards = play(cards, piles, game)
+        self.add_play(backend, time.perf_counter() - start)
+        return played_cards
+
+    def add_play(self, backend: OBackend, seconds: float) -> None:
+        """Add the duration of a move, both as a play phase and to its backend."""
+        for timer in (
+            self.phases["play"],
+            self.backends.setdefault(backend.__class__, OTimer()),
+        ):
+            timer.calls += 1
+            timer.seconds += seconds
+
+    def merge(self, other: "OProfiler") -> None:
+        """Merge the timers of another profiler into this one."""
+        for mine, theirs in (
+            (self.phases, other.phases),
+            (self.backends, other.backends),
+        ):
+            for key, timer in theirs.items():
+                mine.setdefault(key, OTimer()).merge(timer)  # type: ignore[arg-type]
+
+    def report(self) -> dict:
+        """Get the timers as JSON-serializable dictionaries, backends by name."""
+        total = sum(timer.seconds for timer in self.phases.values())
+
+        def describe(timer: OTimer) -> dict:
+            return {
+                "calls": timer.calls,
+                "seconds": timer.seconds,
+                "mean_us": timer.mean_us,
+                "share": timer.seconds / total if total else 0.0,
+            }
+
+        return {
+            "phases": {phase: describe(timer) for phase, timer in self.phases.items()},
+            "backends": {
+                backend.__name__: describe(timer)
+                for backend, timer in sorted(
+                    self.backends.items(), key=lambda item: -item[1].seconds
+                )
+            },
+        }
+
+    def format(self) -> str:
+        """Format the report as a table, the slowest backends first."""
+        report = self.report()
+        lines = []
+        for title, timers in (
+            ("Phase", report["phases"]),
+            ("Backend", report["backends"]),
+        ):
+            lines.append(
+                f"{title:20} {'calls':>10} {'seconds':>10} {'mean us':>10} {'share':>7}"
+            )
+            for name, timer in timers.items():
+                lines.append(
+                    f"{name:20} {timer['calls']:10d} {timer['seconds']:10.3f}"
+                    f" {timer['mean_us']:10.1f} {timer['share']:7.1%}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,224 @@
+"""Adaptive tournaments ranking backends by their TrueSkill-style ratings.
+
+The skill of each backend class is a Gaussian belief, of mean `mu` and standard
+deviation `sigma`. The ranking of the players of a game by score is split in
+pairs, each updating the beliefs of its two backends as a two-player TrueSkill
+game, from the beliefs before the game. A player being in a pair with each of the
+others, each pair only applies `1 / (players - 1)` of its update, so that a game
+counts once per player. Pairs of the same backend and tied scores bring no
+information and are skipped.
+
+Rather than playing random seatings, the scheduler plays the matchup whose games are
+expected to reduce the most the variance of the backends whose confidence intervals
+still overlap, and stops once every interval is separated from the others.
+"""
+import itertools
+import math
+import random
+import statistics
+
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Callable
+
+from ohanami.game import (
+    OGame,
+    derive_seeds,
+    play_games,
+)
+from ohanami.players import (
+    AVAILABLE_PLAYERS,
+    OBackend,
+)
+from ohanami.stats import OScoreStats
+
+# Default TrueSkill belief and performance variability
+MU = 25.0
+SIGMA = MU / 3
+BETA = SIGMA / 2
+
+Matchup = tuple[type[OBackend], ...]
+
+
+def _pdf(t: float) -> float:
+    return math.exp(-t * t / 2) / math.sqrt(2 * math.pi)
+
+
+def _cdf(t: float) -> float:
+    return (1 + math.erf(t / math.sqrt(2))) / 2
+
+
+def _v(t: float) -> float:
+    """Mean correction of the winner of a two-player game."""
+    cdf = _cdf(t)
+    # the ratio tends to -t when the winner was far behind
+    return _pdf(t) / cdf if cdf > 1e-12 else -t
+
+
+def _w(t: float) -> float:
+    """Variance correction of the players of a two-player game."""
+    v = _v(t)
+    return v * (v + t)
+
+
+@dataclass
+class ORating:
+    """Belief over the skill of a backend."""
+
+    mu: float = MU
+    sigma: float = SIGMA
+    games: int = 0
+
+    def interval(self, z: float) -> tuple[float, float]:
+        """Confidence interval of the skill, `z` standard deviations wide each side."""
+        return self.mu - z * self.sigma, self.mu + z * self.sigma
+
+
+@dataclass
+class ORatings:
+    """Ratings of each backend, updated from the rankings of finished games."""
+
+    beta: float = BETA
+    ratings: dict[type[OBackend], ORating] = field(default_factory=dict)
+
+    def __getitem__(self, backend: type[OBackend]) -> ORating:
+        return self.ratings.setdefault(backend, ORating())
+
+    def add_game(self, game: OGame) -> None:
+        """Update the ratings from the scores of a finished game."""
+        players = [(player.backend.__class__, player.score) for player in game.players]
+        updates = {backend: [0.0, 1.0] for backend, _ in players}
+        share = 1 / (len(players) - 1)
+        for (first, first_score), (second, second_score) in itertools.combinations(
+            players, 2
+        ):
+            if first is second or first_score == second_score:
+                continue
+            winner, loser = (
+                (first, second) if first_score > second_score else (second, first)
+            )
+            winning, losing = self[winner], self[loser]
+            c = math.sqrt(2 * self.beta**2 + winning.sigma**2 + losing.sigma**2)
+            t = (winning.mu - losing.mu) / c
+            v, w = _v(t), _w(t)
+            updates[winner][0] += share * winning.sigma**2 / c * v
+            updates[loser][0] -= share * losing.sigma**2 / c * v
+            updates[winner][1] *= 1 - share * winning.sigma**2 / c**2 * w
+            updates[loser][1] *= 1 - share * losing.sigma**2 / c**2 * w
+        for backend, (delta, factor) in updates.items():
+            rating = self[backend]
+            rating.mu += delta
+            rating.sigma *= math.sqrt(factor)
+            rating.games += 1
+
+    def ranking(self) -> list[type[OBackend]]:
+        """Get the backends from the best rated to the worst."""
+        return sorted(self.ratings, key=lambda backend: -self.ratings[backend].mu)
+
+    def overlap(self, first: type[OBackend], second: type[OBackend], z: float) -> bool:
+        """Whether the confidence intervals of two backends overlap."""
+        first_low, first_high = self[first].interval(z)
+        second_low, second_high = self[second].interval(z)
+        return first_low < second_high and second_low < first_high
+
+    def separated(self, z: float) -> bool:
+        """Whether the confidence intervals of all the backends are separated."""
+        ranking = self.ranking()
+        return not any(
+            self.overlap(first, second, z)
+            for first, second in zip(ranking, ranking[1:])
+        )
+
+    def gain(self, first: type[OBackend], second: type[OBackend]) -> float:
+        """Expected reduction of the variances of two backends by a game between them."""
+        if first is second:
+            return 0.0
+        rating, other = self[first], self[second]
+        c2 = 2 * self.beta**2 + rating.sigma**2 + other.sigma**2
+        t = (rating.mu - other.mu) / math.sqrt(c2)
+        win = _cdf(t)
+        w = win * _w(t) + (1 - win) * _w(-t)
+        return (rating.sigma**4 + other.sigma**4) / c2 * w
+
+
+def best_matchup(
+    ratings: ORatings, backends: list[type[OBackend]], players: int, z: float
+) -> Matchup:
+    """Get the matchup of the largest expected gain over the overlapping pairs.
+
+    Matchups seat distinct backends when there are more backends than seats. With as
+    many backends as seats, seating them all would be the only matchup, so backends
+    may take several seats, as with fewer backends, to focus the games on the pairs
+    still overlapping.
+    """
+    matchups = (
+        itertools.combinations(backends, players)
+        if len(backends) > players
+        else itertools.combinations_with_replacement(backends, players)
+    )
+    return max(
+        matchups,
+        key=lambda matchup: sum(
+            ratings.gain(first, second)
+            for first, second in itertools.combinations(matchup, 2)
+            if ratings.overlap(first, second, z)
+        ),
+    )
+
+
+def run_rated(
+    players: int,
+    backends: list[type[OBackend]] | None = None,
+    seed: int | None = None,
+    confidence: float = 0.95,
+    max_games: int = 100_000,
+    round_size: int = 20,
+    progress: Callable[[int, ORatings], None] | None = None,
+) -> tuple[ORatings, OScoreStats]:
+    """Rate backends, playing the most informative matchups until they are ranked.
+
+    Each round plays `round_size` games of the best matchup in lockstep, see
+    `ohanami.game.play_games`, with seats shuffled by `OGame.create`. Games are
+    seeded from the master seed and their index, so a run only depends on the
+    seed.
+
+    Args:
+        players: Number of players per game.
+        backends: Backends to rate, defaults to all the available ones.
+        seed: Master seed, random if None.
+        confidence: Confidence level of the intervals that must be separated.
+        max_games: Number of games after which the tournament stops anyway.
+        round_size: Number of games played between two schedulings.
+        progress: Called with the number of games played and the ratings after
+                  each round.
+
+    Returns:
+        The ratings, and the statistics of each backend over the played games.
+    """
+    backends = backends or AVAILABLE_PLAYERS
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    ratings = ORatings(ratings={backend: ORating() for backend in backends})
+    stats = OScoreStats()
+    played = 0
+    while played < max_games and not ratings.separated(z):
+        matchup = best_matchup(ratings, backends, players, z)
+        games = []
+        for game_seed in derive_seeds(
+            seed, min(round_size, max_games - played), played
+        ):
+            game = OGame.create([backend() for backend in matchup], seed=game_seed)
+            game.output = None
+            games.append(game)
+        play_games(games)
+        for game in games:
+            game.close()
+            ratings.add_game(game)
+            stats.add_game(game)
+        played += len(games)
+        if progress is not None:
+            progress(played, ratings)
+    return ratings, stats
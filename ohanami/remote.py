@@ -0,0 +1,357 @@
+"""Backends served out of process through a compact request/response protocol.
+
+A request carries what a player knows when playing: its hand and discarded cards, the
+piles, hand sizes, discard counts and total scores of every seat, the season and the
+turn, along with a seed for the backend generator. It is encoded in bytes:
+
+- backend index, seat, number of players, season, turn: one byte each,
+- seed: 8 bytes,
+- for each seat: hand size, discard count, total score (2 bytes), then for each pile
+  its size followed by its card values, one byte each,
+- the hand then the discarded cards of the player, one byte per card value,
+- the size of the remaining deck.
+
+Requests are batched in frames: the number of requests on 4 bytes, then each request
+prefixed by its size on 2 bytes. The response to a request is 4 bytes: the pile index (3 for a discard)
+and the card value of its two cards.
+
+Pools play a request by rebuilding a game in which the hidden cards (the other hands,
+their discarded cards and the remaining deck) are dealt at random from the cards the
+player has not seen, then asking its backend. A pool keeps one instance of each of its
+backends, so backends keeping a state between moves are not supported.
+"""
+import multiprocessing
+import multiprocessing.connection
+import random
+import struct
+
+from ohanami.compact import CARDS
+from ohanami.game import (
+    OCard,
+    OGame,
+    OPile,
+    OPileView,
+    OPlayer,
+    OSeason,
+)
+from ohanami.players import OBackend
+
+Move = tuple[tuple[int | None, OCard], tuple[int | None, OCard]]
+
+DISCARD = 3
+HEADER = struct.Struct("<BBBBBQ")
+SEAT = struct.Struct("<BBH")
+MOVE = struct.Struct("<BBBB")
+SIZE = struct.Struct("<H")
+COUNT = struct.Struct("<I")
+EMPTY_PILE = OPile()
+
+
+def read_cards(values: bytes) -> list[OCard]:
+    return [CARDS[value] for value in values]  # type: ignore[misc]
+
+
+def read_pile(values: bytes) -> OPile:
+    # copying an empty pile skips the initialization of its counters
+    pile = EMPTY_PILE.copy()
+    for card in read_cards(values):
+        pile.add(card)
+    return pile
+
+
+def encode_request(game: OGame, n_player: int, n_backend: int) -> bytes:
+    """Encode what a player knows, drawing the seed of its backend from the game."""
+    player = game.players[n_player]
+    data = bytearray(
+        HEADER.pack(
+            n_backend,
+            n_player,
+            len(game.players),
+            game.current_season.value,
+            game.current_turn,
+            game.rng.getrandbits(64),
+        )
+    )
+    for other in game.players:
+        data += SEAT.pack(
+            len(other.hand), len(other.discarded_cards), other.total_score
+        )
+        for pile in other.piles:
+            data.append(len(pile.cards))
+            data += bytes(card.value for card in pile.cards)
+    data += bytes(card.value for card in player.hand)
+    data += bytes(card.value for card in player.discarded_cards)
+    data.append(len(game.remaining_deck))
+    return bytes(data)
+
+
+def decode_request(data: bytes) -> tuple[int, int, OGame]:
+    """Rebuild the game of a request, its hidden cards dealt at random.
+
+    Returns:
+        The backend index, the seat of the player and the game, whose players have
+        no backend.
+    """
+    n_backend, n_player, players, season, turn, seed = HEADER.unpack_from(data)
+    offset = HEADER.size
+    game = OGame(None, [], seed=seed, rng=random.Random(seed), output=None)
+    game.current_season = OSeason(season)
+    game.current_turn = turn
+    sizes = []
+    for n_seat in range(players):
+        hand_size, discarded, total_score = SEAT.unpack_from(data, offset)
+        offset += SEAT.size
+        piles = []
+        for _ in range(3):
+            length = data[offset]
+            piles.append(read_pile(data[offset + 1 : offset + 1 + length]))
+            offset += 1 + length
+        game.players.append(
+            OPlayer(
+                OBackend(),
+                f"seat_{n_seat}",
+                piles=(piles[0], piles[1], piles[2]),
+                total_score=total_score,
+            )
+        )
+        sizes.append((hand_size, discarded))
+    player = game.players[n_player]
+    hand_size, discarded = sizes[n_player]
+    player.hand = read_cards(data[offset : offset + hand_size])
+    offset += hand_size
+    player.discarded_cards = read_cards(data[offset : offset + discarded])
+    offset += discarded
+    seen = {card.value for card in player.hand + player.discarded_cards}
+    for other in game.players:
+        for pile in other.piles:
+            seen.update(card.value for card in pile.cards)
+    unseen = [card for card in CARDS[1:] if card.value not in seen]
+    game.rng.shuffle(unseen)
+    for n_other, (other, (hand_size, discarded)) in enumerate(zip(game.players, sizes)):
+        if n_other == n_player:
+            continue
+        other.hand, unseen = unseen[:hand_size], unseen[hand_size:]
+        other.discarded_cards, unseen = unseen[:discarded], unseen[discarded:]
+    game.remaining_deck = unseen[: data[offset]]
+    game.current_player = game.players[0]
+    game.current_seat = n_player
+    return n_backend, n_player, game
+
+
+def encode_move(move: Move) -> bytes:
+    (first_pile, first_card), (second_pile, second_card) = move
+    return MOVE.pack(
+        DISCARD if first_pile is None else first_pile,
+        first_card.value,
+        DISCARD if second_pile is None else second_pile,
+        second_card.value,
+    )
+
+
+def decode_move(data: bytes, offset: int = 0) -> Move:
+    first_pile, first_value, second_pile, second_value = MOVE.unpack_from(data, offset)
+    first_card, second_card = read_cards(bytes((first_value, second_value)))
+    return (
+        (None if first_pile == DISCARD else first_pile, first_card),
+        (None if second_pile == DISCARD else second_pile, second_card),
+    )
+
+
+def encode_frame(requests: list[bytes]) -> bytes:
+    data = bytearray(COUNT.pack(len(requests)))
+    for request in requests:
+        data += SIZE.pack(len(request)) + request
+    return bytes(data)
+
+
+def decode_frame(data: bytes) -> list[bytes]:
+    (count,) = COUNT.unpack_from(data)
+    offset = COUNT.size
+    requests = []
+    for _ in range(count):
+        (size,) = SIZE.unpack_from(data, offset)
+        offset += SIZE.size
+        requests.append(data[offset : offset + size])
+        offset += size
+    return requests
+
+
+def handle_frame(frame: bytes, instances: list[OBackend]) -> bytes:
+    """Play the requests of a frame, returning their concatenated responses."""
+    responses = bytearray()
+    for request in decode_frame(frame):
+        n_backend, n_player, game = decode_request(request)
+        backend = instances[n_backend]
+        player = game.players[n_player]
+        player.backend = backend
+        responses += encode_move(
+            backend.play(
+                list(player.hand),
+                (
+                    OPileView(player.piles[0]),
+                    OPileView(player.piles[1]),
+                    OPileView(player.piles[2]),
+                ),
+                game,
+            )
+        )
+    return bytes(responses)
+
+
+def serve(
+    connection: multiprocessing.connection.Connection,
+    backends: list[type[OBackend]],
+) -> None:
+    """Answer the frames received on a connection until an empty one."""
+    instances = [backend() for backend in backends]
+    while frame := connection.recv_bytes():
+        connection.send_bytes(handle_frame(frame, instances))
+    for instance in instances:
+        instance.close()
+    connection.close()
+
+
+class OBackendPool:
+    """Plays the moves of players through encoded requests.
+
+    Args:
+        backends: Backends served by the pool.
+    """
+
+    def __init__(self, backends: list[type[OBackend]]) -> None:
+        self.backends = list(backends)
+        self.ids = {backend: n_backend for n_backend, backend in enumerate(backends)}
+
+    def play(self, requests: list[tuple[OGame, int, type[OBackend]]]) -> list[Move]:
+        """Get the moves of players, given by their game, seat and backend."""
+        responses = self.exchange(
+            [
+                encode_request(game, n_player, self.ids[backend])
+                for game, n_player, backend in requests
+            ]
+        )
+        return [
+            decode_move(responses, 4 * n_request) for n_request in range(len(requests))
+        ]
+
+    def exchange(self, requests: list[bytes]) -> bytes:
+        """Send encoded requests, returning their concatenated responses."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "OBackendPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class OLocalPool(OBackendPool):
+    """Stand-in pool playing the requests in the current process."""
+
+    def __init__(self, backends: list[type[OBackend]]) -> None:
+        super().__init__(backends)
+        self.instances = [backend() for backend in backends]
+
+    def exchange(self, requests: list[bytes]) -> bytes:
+        return handle_frame(encode_frame(requests), self.instances)
+
+    def close(self) -> None:
+        for instance in self.instances:
+            instance.close()
+
+
+class OProcessPool(OBackendPool):
+    """Pool of persistent worker processes, each holding its own backends.
+
+    The requests of a batch are split evenly between the workers, with one frame per
+    worker.
+
+    Args:
+        backends: Backends served by the pool.
+        workers: Number of worker processes.
+    """
+
+    def __init__(self, backends: list[type[OBackend]], workers: int = 1) -> None:
+        super().__init__(backends)
+        self.connections: list[multiprocessing.connection.Connection] = []
+        self.processes: list[multiprocessing.Process] = []
+        for _ in range(workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=serve, args=(worker_connection, self.backends), daemon=True
+            )
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def exchange(self, requests: list[bytes]) -> bytes:
+        chunk = -(-len(requests) // len(self.connections))
+        busy = []
+        for connection, start in zip(self.connections, range(0, len(requests), chunk)):
+            connection.send_bytes(encode_frame(requests[start : start + chunk]))
+            busy.append(connection)
+        return b"".join(connection.recv_bytes() for connection in busy)
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send_bytes(b"")
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+
+class ORemoteBackend(OBackend):
+    """Backend playing each of its moves through a pool.
+
+    Args:
+        pool: Pool serving the moves.
+        backend: Backend of the pool playing the moves.
+    """
+
+    def __init__(self, pool: OBackendPool, backend: type[OBackend]) -> None:
+        self.pool = pool
+        self.backend = backend
+        self.noob = backend.noob
+
+    def play(
+        self, cards: "list[OCard]", piles: "tuple[OPile, OPile, OPile]", game: OGame
+    ) -> Move:
+        return self.pool.play([(game, self.get_seat(game), self.backend)])[0]
+
+
+def play_games(games: list[OGame], pool: OBackendPool) -> None:
+    """Play games in lockstep, batching the moves of all their players at each turn.
+
+    As in the actual game, the players of a turn all choose their cards before any is
+    placed. Players are served by the pool backend of their class, or by the one they
+    proxy if they are `ORemoteBackend`.
+    """
+    for game in games:
+        game.deal_cards()
+    playing = list(games)
+    while playing:
+        requests = []
+        for game in playing:
+            game.begin_turn()
+            for n_player, player in enumerate(game.players):
+                backend = player.backend
+                requests.append(
+                    (
+                        game,
+                        n_player,
+                        backend.backend
+                        if isinstance(backend, ORemoteBackend)
+                        else backend.__class__,
+                    )
+                )
+        for (game, n_player, _), move in zip(requests, pool.play(requests)):
+            game.players[n_player].commit(move, game)
+        for game in playing:
+            game.end_turn()
+        playing = [game for game in playing if not game.finished]
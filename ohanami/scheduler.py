@@ -0,0 +1,118 @@
+"""Many games multiplexed on one event loop.
+
+Each game runs its asynchronous loop, see `OGame.start_async`, as a task of the
+scheduler. Backends served by a pool of backend workers, see `ohanami.remote`, send
+their moves through a shared batcher: the moves requested by all the games during
+an iteration of the event loop are sent to the pool as one batch, while the games
+with local backends keep playing.
+"""
+import asyncio
+
+from ohanami.game import (
+    OCard,
+    OGame,
+    OPile,
+)
+from ohanami.players import (
+    OAsyncBackend,
+    OBackend,
+)
+from ohanami.remote import (
+    Move,
+    OBackendPool,
+    decode_move,
+    encode_request,
+)
+
+
+class OMoveBatcher:
+    """Gathers the moves requested to a pool into batches.
+
+    A single batch is sent to the pool at a time, from a worker thread, the
+    requests made in the meantime forming the next batch.
+
+    Args:
+        pool: Pool serving the moves.
+    """
+
+    def __init__(self, pool: OBackendPool) -> None:
+        self.pool = pool
+        self.pending: list[tuple[bytes, asyncio.Future]] = []
+        self.busy = False
+        # Number of batches and requests sent to the pool
+        self.batches = 0
+        self.requests = 0
+
+    async def play(self, game: OGame, n_player: int, backend: type[OBackend]) -> Move:
+        """Get the move of a player from the pool backend of its class."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append(
+            (encode_request(game, n_player, self.pool.ids[backend]), future)
+        )
+        if len(self.pending) == 1 and not self.busy:
+            loop.call_soon(self.flush)
+        return await future
+
+    def flush(self) -> None:
+        if self.busy or not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.busy = True
+        self.batches += 1
+        self.requests += len(batch)
+        exchange = asyncio.get_running_loop().run_in_executor(
+            None, self.pool.exchange, [request for request, _ in batch]
+        )
+
+        def distribute(exchange: asyncio.Future) -> None:
+            self.busy = False
+            error = exchange.exception()
+            for n_request, (_, future) in enumerate(batch):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(decode_move(exchange.result(), 4 * n_request))
+            self.flush()
+
+        exchange.add_done_callback(distribute)
+
+
+class OBatchedBackend(OAsyncBackend):
+    """Backend playing its moves through a batcher.
+
+    Args:
+        batcher: Batcher of the pool serving the moves.
+        backend: Backend of the pool playing the moves.
+    """
+
+    def __init__(self, batcher: OMoveBatcher, backend: type[OBackend]) -> None:
+        self.batcher = batcher
+        self.backend = backend
+        self.noob = backend.noob
+
+    async def play_async(
+        self, cards: list[OCard], piles: tuple[OPile, OPile, OPile], game: OGame
+    ) -> Move:
+        return await self.batcher.play(game, self.get_seat(game), self.backend)
+
+
+async def play_games_async(games: list[OGame], concurrency: int | None = None) -> None:
+    """Play games concurrently on the running event loop.
+
+    Args:
+        games: Games to play.
+        concurrency: Maximum number of games played at once, unlimited if None.
+    """
+    semaphore = asyncio.Semaphore(concurrency or len(games) or 1)
+
+    async def play(game: OGame) -> None:
+        async with semaphore:
+            await game.start_async()
+
+    await asyncio.gather(*(play(game) for game in games))
+
+
+def run_games(games: list[OGame], concurrency: int | None = None) -> None:
+    """Play games concurrently on a new event loop."""
+    asyncio.run(play_games_async(games, concurrency))
@@ -0,0 +1,287 @@
+"""Self-play data generation, in sharded files of training samples.
+
+A sample is the observation of a player when asked for a move, see
+`ohanami.encoding`, the action it chose and its final score. A data set is a
+directory holding a `manifest.json`, with the master seed and the settings of the
+data set, and one file per shard of games, named after the index of its first game.
+
+A shard file starts with a header holding the observation size and the names of the
+backends. It is followed by fixed-size sample records:
+
+- the game seed, as an unsigned 64-bit integer,
+- the seat of the player and the index of its backend, one byte each,
+- the observation, as 16-bit integers,
+- the action and the final score of the player.
+
+The records of a shard are ordered by turn, game and seat. Shards are written
+turn by turn, then renamed once complete, so an interrupted generation is resumed
+by generating the missing shards only. Shards are memory-mapped when read.
+"""
+import json
+import os
+import random
+import struct
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed,
+)
+from typing import (
+    BinaryIO,
+    Callable,
+    Iterator,
+)
+
+import numpy as np
+
+from ohanami.encoding import (
+    OBSERVATION_SIZE,
+    encode,
+    encode_action,
+)
+from ohanami.game import (
+    Move,
+    OGame,
+    OPlayer,
+    derive_seeds,
+    play_games,
+)
+from ohanami.players import (
+    AVAILABLE_PLAYERS,
+    OBackend,
+)
+
+MAGIC = b"OHSPL"
+VERSION = 1
+TURNS = 15
+MANIFEST = "manifest.json"
+
+
+def sample_dtype(observation_size: int = OBSERVATION_SIZE) -> np.dtype:
+    """Get the dtype of the sample records of a shard."""
+    return np.dtype(
+        [
+            ("seed", "<u8"),
+            ("seat", "u1"),
+            ("backend", "u1"),
+            ("observation", "<i2", (observation_size,)),
+            ("action", "<u2"),
+            ("score", "<i2"),
+        ]
+    )
+
+
+def shard_path(directory: str, offset: int) -> str:
+    return os.path.join(directory, f"shard-{offset:012d}.ohspl")
+
+
+def read_header(file: BinaryIO) -> tuple[int, list[str]]:
+    """Read the header of a shard, returning its observation size and backend names."""
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{file.name} is not an Ohanami self-play shard.")
+    version, observation_size, nbackends = struct.unpack("<BHB", file.read(4))
+    if version != VERSION:
+        raise ValueError(f"Unsupported self-play shard version {version}.")
+    names = []
+    for _ in range(nbackends):
+        (length,) = struct.unpack("<B", file.read(1))
+        names.append(file.read(length).decode())
+    return observation_size, names
+
+
+def generate_shard(
+    directory: str,
+    seed: int,
+    offset: int,
+    games: int,
+    players: int,
+    backends: list[type[OBackend]] | None = None,
+) -> int:
+    """Play a shard of games in lockstep and write their samples.
+
+    Games are seeded from the master seed and their index in the data set, the
+    shard starting at game `offset`. Only the samples of a turn are held in memory
+    besides the games. A shard already complete is not generated again.
+
+    Returns:
+        The number of samples of the shard.
+    """
+    path = shard_path(directory, offset)
+    if os.path.exists(path) and len(OSelfPlayReader(path)) == games * players * TURNS:
+        return games * players * TURNS
+    backends = backends or AVAILABLE_PLAYERS
+    backend_ids = {backend: n_backend for n_backend, backend in enumerate(backends)}
+    shard = []
+    for game_seed in derive_seeds(seed, games, offset):
+        game = OGame.create(
+            [None for _ in range(players)], seed=game_seed, available=backends
+        )
+        game.output = None
+        shard.append(game)
+    dtype = sample_dtype()
+    records = np.zeros(games * players, dtype=dtype)
+    indices = {id(game): n_game for n_game, game in enumerate(shard)}
+
+    with open(path + ".tmp", "wb") as file:
+        file.write(
+            MAGIC + struct.pack("<BHB", VERSION, OBSERVATION_SIZE, len(backends))
+        )
+        for backend in backends:
+            encoded = backend.__name__.encode()
+            file.write(struct.pack("<B", len(encoded)) + encoded)
+        header_size = file.tell()
+
+        def record(moves: list[tuple[OGame, OPlayer, Move]]) -> None:
+            # all games of a shard play the same number of turns
+            moves = sorted(
+                moves,
+                key=lambda move: (
+                    indices[id(move[0])],
+                    move[0].players.index(move[1]),
+                ),
+            )
+            games = [game for game, _, _ in moves]
+            seats = [game.players.index(player) for game, player, _ in moves]
+            records["seed"] = [game.seed for game in games]
+            records["seat"] = seats
+            records["backend"] = [
+                backend_ids[player.backend.__class__] for _, player, _ in moves
+            ]
+            encode(games, seats, records["observation"])
+            records["action"] = [
+                encode_action(played_cards, player.hand)
+                for _, player, played_cards in moves
+            ]
+            file.write(records.tobytes())
+
+        play_games(shard, record)
+    for game in shard:
+        game.close()
+    samples: np.ndarray = np.memmap(
+        path + ".tmp",
+        dtype=dtype,
+        mode="r+",
+        offset=header_size,
+        shape=(TURNS, games, players),
+    )
+    samples["score"] = [[player.score for player in game.players] for game in shard]
+    samples.flush()
+    del samples
+    os.replace(path + ".tmp", path)
+    return games * players * TURNS
+
+
+def read_manifest(directory: str) -> dict | None:
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def generate(
+    directory: str,
+    games: int,
+    players: int,
+    seed: int | None = None,
+    workers: int | None = None,
+    shard_size: int = 1000,
+    progress: Callable[[int, int], None] | None = None,
+    backends: list[type[OBackend]] | None = None,
+) -> int:
+    """Generate a self-play data set over a pool of worker processes.
+
+    A data set already in `directory` is resumed, its missing shards being
+    generated. It must have been created with the same number of players, shard
+    size and backends, and its master seed is used if `seed` is None. Asking for
+    more games than a former run extends the data set.
+
+    Args:
+        directory: Directory of the data set, created if needed.
+        games: Number of games of the data set.
+        players: Number of players per game.
+        seed: Master seed, the one of the data set or a random one if None.
+        workers: Number of worker processes, defaults to the number of CPUs.
+        shard_size: Number of games per shard, bounding the memory of each worker.
+        progress: Called in the main process with the number of completed shards
+                  and the total number of shards each time a shard completes.
+        backends: Backends seated at random, defaults to all the available ones.
+
+    Returns:
+        The number of samples of the data set.
+    """
+    backends = backends or AVAILABLE_PLAYERS
+    settings = {
+        "version": VERSION,
+        "players": players,
+        "shard_size": shard_size,
+        "backends": [backend.__name__ for backend in backends],
+    }
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    if manifest is None:
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+    else:
+        for key, value in settings.items():
+            if manifest[key] != value:
+                raise ValueError(
+                    f"{directory} was generated with {key} {manifest[key]}, not {value}."
+                )
+        if seed is None:
+            seed = manifest["seed"]
+        elif seed != manifest["seed"]:
+            raise ValueError(f"{directory} was generated with seed {manifest['seed']}.")
+    with open(os.path.join(directory, MANIFEST), "w") as file:
+        json.dump({**settings, "seed": seed}, file, indent=2)
+    offsets = list(range(0, games, shard_size))
+    sizes = [min(shard_size, games - offset) for offset in offsets]
+    samples = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                generate_shard, directory, seed, offset, size, players, backends
+            )
+            for offset, size in zip(offsets, sizes)
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            samples += future.result()
+            if progress is not None:
+                progress(done, len(sizes))
+    return samples
+
+
+class OSelfPlayReader:
+    """Memory-mapped view of a shard."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            observation_size, self.backends = read_header(file)
+            offset = file.tell()
+        self.dtype = sample_dtype(observation_size)
+        count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        self.records: np.ndarray = (
+            np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+            if count
+            else np.zeros(0, dtype=self.dtype)
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def list_shards(directory: str) -> list[str]:
+    """Get the paths of the complete shards of a data set, in game order."""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.startswith("shard-") and name.endswith(".ohspl")
+    )
+
+
+def iter_samples(directory: str, chunk_size: int = 65536) -> Iterator[np.ndarray]:
+    """Lazily iterate over the samples of a data set, by chunks of records."""
+    for path in list_shards(directory):
+        records = OSelfPlayReader(path).records
+        for start in range(0, len(records), chunk_size):
+            yield np.asarray(records[start : start + chunk_size])
@@ -0,0 +1,157 @@
+"""Streaming score statistics for tournaments.
+
+Statistics are updated in constant time per score and can be merged, so that worker
+processes can each accumulate their own and send them back to the main process.
+"""
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ohanami.budget import OOverruns
+from ohanami.players import OBackend
+from ohanami.profiling import OProfiler
+
+if TYPE_CHECKING:
+    from ohanami.game import OGame
+
+# Scores are binned by unit, the last bin gathering all the larger scores
+SCORE_BINS = 400
+
+MixKey = tuple[type[OBackend], tuple[type[OBackend], ...]]
+
+
+@dataclass
+class ORunningStats:
+    """Welford mean and variance of a series of scores, with their histogram."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    histogram: np.ndarray = field(
+        default_factory=lambda: np.zeros(SCORE_BINS, dtype=np.int64)
+    )
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the scores."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance**0.5
+
+    def add(self, score: int) -> None:
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.histogram[min(max(score, 0), SCORE_BINS - 1)] += 1
+
+    def add_many(self, scores: np.ndarray) -> None:
+        """Add an array of scores at once."""
+        if not scores.size:
+            return
+        batch = ORunningStats(
+            scores.size,
+            float(scores.mean()),
+            float(((scores - scores.mean()) ** 2).sum()),
+            np.bincount(np.clip(scores, 0, SCORE_BINS - 1), minlength=SCORE_BINS),
+        )
+        self.merge(batch)
+
+    def merge(self, other: "ORunningStats") -> None:
+        """Merge the statistics of another series of scores into this one."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.histogram += other.histogram
+
+
+@dataclass
+class OScoreStats:
+    """Scores statistics of each backend, overall, per seat and per opponents mix."""
+
+    backends: dict[type[OBackend], ORunningStats] = field(default_factory=dict)
+    seats: dict[tuple[type[OBackend], int], ORunningStats] = field(default_factory=dict)
+    mixes: dict[MixKey, ORunningStats] = field(default_factory=dict)
+    # Overruns of the time budgets, if the games had budgets
+    overruns: dict[type[OBackend], OOverruns] = field(default_factory=dict)
+    # Timers of the games, if they were profiled
+    profiler: OProfiler | None = None
+
+    def __getitem__(self, backend: type[OBackend]) -> ORunningStats:
+        return self.backends.setdefault(backend, ORunningStats())
+
+    def add_game(self, game: "OGame") -> None:
+        """Add the scores of a finished game."""
+        backends = [player.backend.__class__ for player in game.players]
+        for seat, player in enumerate(game.players):
+            backend = backends[seat]
+            opponents = tuple(
+                sorted(backends[:seat] + backends[seat + 1 :], key=lambda b: b.__name__)
+            )
+            score = player.score
+            self[backend].add(score)
+            self.seats.setdefault((backend, seat), ORunningStats()).add(score)
+            self.mixes.setdefault((backend, opponents), ORunningStats()).add(score)
+
+    def add_batch(
+        self, seats: np.ndarray, scores: np.ndarray, backends: list[type[OBackend]]
+    ) -> None:
+        """Add the scores of a batch of games.
+
+        Args:
+            seats: Index in `backends` of the backend of each seat, of shape (games, players).
+            scores: Score of each seat, of shape (games, players).
+            backends: Backends classes.
+        """
+        players = seats.shape[1]
+        for seat in range(players):
+            opponents = np.sort(np.delete(seats, seat, axis=1), axis=1)
+            mixes, mix_index = np.unique(opponents, axis=0, return_inverse=True)
+            mix_index = mix_index.reshape(-1)
+            for n_backend, backend in enumerate(backends):
+                played = seats[:, seat] == n_backend
+                if not played.any():
+                    continue
+                self[backend].add_many(scores[played, seat])
+                self.seats.setdefault((backend, seat), ORunningStats()).add_many(
+                    scores[played, seat]
+                )
+                for n_mix, mix in enumerate(mixes):
+                    mixed = played & (mix_index == n_mix)
+                    if not mixed.any():
+                        continue
+                    key = (
+                        backend,
+                        tuple(
+                            sorted((backends[n] for n in mix), key=lambda b: b.__name__)
+                        ),
+                    )
+                    self.mixes.setdefault(key, ORunningStats()).add_many(
+                        scores[mixed, seat]
+                    )
+
+    def merge(self, other: "OScoreStats") -> None:
+        """Merge the statistics of another tournament into this one."""
+        for mine, theirs in (
+            (self.backends, other.backends),
+            (self.seats, other.seats),
+            (self.mixes, other.mixes),
+        ):
+            for key, stats in theirs.items():
+                mine.setdefault(key, ORunningStats()).merge(stats)  # type: ignore[arg-type]
+        for backend, overruns in other.overruns.items():
+            self.overruns.setdefault(backend, OOverruns()).merge(overruns)
+        if other.profiler is not None:
+            if self.profiler is None:
+                self.profiler = OProfiler()
+            self.profiler.merge(other.profiler)
@@ -0,0 +1,233 @@
+"""Headless tournaments sharded over worker processes.
+
+Games are split in fixed-size shards and seeded from the master seed and their index
+only, so that results do not depend on the number of workers.
+"""
+import contextlib
+import os
+import random
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed,
+)
+from typing import Callable
+
+import numpy as np
+
+from ohanami.budget import OBudget
+from ohanami.game import (
+    OGame,
+    derive_seeds,
+    play_games,
+)
+from ohanami.gamelog import OGameLogWriter
+from ohanami.players import (
+    AVAILABLE_PLAYERS,
+    OBackend,
+)
+from ohanami.profiling import OProfiler
+from ohanami.stats import OScoreStats
+
+
+def play_shard(
+    seed: int,
+    offset: int,
+    games: int,
+    players: int,
+    batch: bool = False,
+    backends: list[type[OBackend]] | None = None,
+    log_dir: str | None = None,
+    profile: bool = False,
+    budget: OBudget | None = None,
+    lockstep: bool = False,
+) -> OScoreStats:
+    """Play a shard of games and gather the statistics of each backend.
+
+    Games are seeded from the master seed and their index in the tournament, the
+    shard starting at game `offset`. If `log_dir` is given, the games are logged
+    in its `shard-<offset>.ohlog` file. If `profile` is True, the games are timed in
+    the profiler of the returned statistics. If `budget` is given, the backends
+    moves are limited by it, and its overruns are returned in the statistics. If
+    `lockstep` is True, the games of the shard are played together, see
+    `ohanami.game.play_games`.
+    """
+    if batch and (log_dir is not None or profile or budget is not None):
+        raise ValueError("Batch games cannot be logged, profiled nor budgeted.")
+    if batch:
+        from ohanami.batch import run_tournament
+
+        return run_tournament(
+            games, players, np.random.default_rng([seed, offset]), backends=backends
+        )
+    stats = OScoreStats(profiler=OProfiler() if profile else None)
+    with contextlib.ExitStack() as stack:
+        log = (
+            None
+            if log_dir is None
+            else stack.enter_context(
+                OGameLogWriter(
+                    os.path.join(log_dir, f"shard-{offset}.ohlog"),
+                    players,
+                    backends or AVAILABLE_PLAYERS,
+                )
+            )
+        )
+        shard = []
+        for game_seed in derive_seeds(seed, games, offset):
+            game = OGame.create(
+                [None for _ in range(players)], seed=game_seed, available=backends
+            )
+            game.output = None
+            game.profiler = stats.profiler
+            game.budget = budget
+            if log is not None:
+                game.history = []
+            if not lockstep:
+                game.start()
+            shard.append(game)
+        if lockstep:
+            play_games(shard)
+        for game in shard:
+            game.close()
+            stats.add_game(game)
+            if log is not None:
+                log.write(game)
+    if budget is not None:
+        budget.close()
+        stats.overruns = budget.overruns
+    return stats
+
+
+def run(
+    games: int,
+    players: int,
+    seed: int | None = None,
+    workers: int | None = None,
+    shard_size: int = 1000,
+    batch: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+    backends: list[type[OBackend]] | None = None,
+    log_dir: str | None = None,
+    profile: bool = False,
+    budget: OBudget | None = None,
+    lockstep: bool = False,
+) -> OScoreStats:
+    """Play a tournament over a pool of worker processes.
+
+    Results only depend on the master seed and the shard size, not on the number
+    of workers.
+
+    Args:
+        games: Number of games to play.
+        players: Number of players per game.
+        seed: Master seed, random if None.
+        workers: Number of worker processes, defaults to the number of CPUs.
+        shard_size: Number of games per shard.
+        batch: If True, play the shards with the vectorized engine.
+        progress: Called in the main process with the number of completed shards
+                  and the total number of shards each time a shard completes.
+        backends: Backends seated at random, defaults to all the available ones.
+        log_dir: If given, directory where each shard logs its games, see
+                 `ohanami.gamelog`. Not supported by the vectorized engine.
+        profile: If True, time the phases of the games and the backends moves, see
+                 `OScoreStats.profiler`. Not supported by the vectorized engine.
+        budget: Time limits of the backends moves, see `ohanami.budget`, their
+                overruns being gathered in `OScoreStats.overruns`. Not supported by
+                the vectorized engine.
+        lockstep: If True, play the games of each shard in lockstep, batching the
+                  moves of each backend class, see `ohanami.game.play_games`. Not
+                  supported with a budget.
+
+    Returns:
+        The statistics of each backend, merged in shard order.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+    offsets = list(range(0, games, shard_size))
+    sizes = [min(shard_size, games - offset) for offset in offsets]
+    results: list[OScoreStats] = [OScoreStats() for _ in sizes]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                play_shard,
+                seed,
+                offset,
+                size,
+                players,
+                batch,
+                backends,
+                log_dir,
+                profile,
+                budget,
+                lockstep,
+            ): n_shard
+            for n_shard, (offset, size) in enumerate(zip(offsets, sizes))
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(done, len(sizes))
+    stats = OScoreStats()
+    for result in results:
+        stats.merge(result)
+    return stats
+
+
+def run_remote(
+    games: int,
+    players: int,
+    seed: int | None = None,
+    workers: int = 1,
+    shard_size: int = 1000,
+    progress: Callable[[int, int], None] | None = None,
+    backends: list[type[OBackend]] | None = None,
+) -> OScoreStats:
+    """Play a tournament in this process, the moves being served by backend workers.
+
+    The games of each shard are played in lockstep by `ohanami.remote.play_games`, so
+    that the moves of all their players are sent to the workers in a single batch
+    per turn. Results only depend on the master seed and the shard size.
+
+    Args:
+        games: Number of games to play.
+        players: Number of players per game.
+        seed: Master seed, random if None.
+        workers: Number of backend worker processes.
+        shard_size: Number of games played in lockstep.
+        progress: Called with the number of completed shards and the total number
+                  of shards each time a shard completes.
+        backends: Backends seated at random, defaults to all the available ones.
+
+    Returns:
+        The statistics of each backend.
+    """
+    from ohanami.remote import (
+        OProcessPool,
+        play_games,
+    )
+
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    offsets = list(range(0, games, shard_size))
+    stats = OScoreStats()
+    with OProcessPool(backends or AVAILABLE_PLAYERS, workers) as pool:
+        for n_shard, offset in enumerate(offsets, start=1):
+            shard = []
+            for game_seed in derive_seeds(
+                seed, min(shard_size, games - offset), offset
+            ):
+                game = OGame.create(
+                    [None for _ in range(players)], seed=game_seed, available=backends
+                )
+                game.output = None
+                shard.append(game)
+            play_games(shard, pool)
+            for game in shard:
+                game.close()
+                stats.add_game(game)
+            if progress is not None:
+                progress(n_shard, len(offsets))
+    return stats
@@ -0,0 +1,173 @@
+"""Knowledge of each player about the cards of a game.
+
+Sets of cards are stored as integers, the bit `value` being set for the card of
+that value. For each player, the tracker keeps the cards it has held, and for each
+hand it has held during the season, the cards it passed on, by the seat now
+holding that hand. Cards placed on piles are public to all players, while a
+discarded card is only known to its player: the others only see the hand it was
+in getting smaller.
+
+Placing or discarding a card updates a single mask, hands only being read when
+they are dealt and passed, so that backends can query what a player knows without
+scanning the piles of the game.
+"""
+import random
+
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import TYPE_CHECKING
+
+from ohanami.compact import (
+    CARD_COLORS,
+    CARDS,
+    COLORS,
+)
+from ohanami.game import (
+    OCard,
+    OColor,
+)
+
+if TYPE_CHECKING:
+    from ohanami.game import OMove
+
+# Cards of each color, in `OColor` order
+COLOR_MASKS: tuple[int, ...] = tuple(
+    sum(1 << value for value in range(1, 121) if CARD_COLORS[value] == n_color)
+    for n_color in range(len(COLORS))
+)
+ALL_CARDS = sum(COLOR_MASKS)
+
+
+def to_mask(cards: list[OCard]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.value
+    return mask
+
+
+def to_values(mask: int) -> list[int]:
+    """Get the card values of a mask, from the smallest to the largest."""
+    values = []
+    while mask:
+        low = mask & -mask
+        values.append(low.bit_length() - 1)
+        mask ^= low
+    return values
+
+
+@dataclass
+class OCardTracker:
+    """Cards seen by each player of a game, kept up to date by the game."""
+
+    # Cards each player has held
+    seen: list[int] = field(default_factory=list)
+    # Cards placed on any pile
+    public: int = 0
+    # For each player, the cards of the hand held by each seat it knows of, 0 for
+    # the hands it has not held this season. Only the hand of the player itself
+    # does not include the cards discarded since it was passed.
+    known: list[list[int]] = field(default_factory=list)
+    # Number of cards of the remaining deck
+    deck: int = 0
+
+    def copy(self) -> "OCardTracker":
+        return OCardTracker(
+            list(self.seen),
+            self.public,
+            [list(hands) for hands in self.known],
+            self.deck,
+        )
+
+    def deal(self, hands: list[list[OCard]], deck: int, new_game: bool) -> None:
+        """Record the hands dealt at the start of a season."""
+        if new_game:
+            self.seen = [0] * len(hands)
+            self.public = 0
+        self.known = [[0] * len(hands) for _ in hands]
+        for n_player, hand in enumerate(hands):
+            mask = to_mask(hand)
+            self.seen[n_player] |= mask
+            self.known[n_player][n_player] = mask
+        self.deck = deck
+
+    def play(self, n_player: int, move: "OMove") -> None:
+        """Record the cards of a move."""
+        for card, _, pile in move.cards:
+            if pile is None:
+                self.known[n_player][n_player] &= ~(1 << card.value)
+            else:
+                self.public |= 1 << card.value
+
+    def undo(self, n_player: int, move: "OMove") -> None:
+        """Forget the cards of a move, see `OGame.undo_move`."""
+        for card, _, pile in move.cards:
+            if pile is None:
+                self.known[n_player][n_player] |= 1 << card.value
+            else:
+                self.public &= ~(1 << card.value)
+
+    def pass_hands(self, hands: list[list[OCard]], backward: bool) -> None:
+        """Record the hands received by the players once passed.
+
+        Args:
+            hands: Hands of the players once passed.
+            backward: Whether each player received the hand of the next one, as in
+                      the second season, rather than the previous one.
+        """
+        for n_player, known in enumerate(self.known):
+            self.known[n_player] = (
+                known[1:] + known[:1] if backward else known[-1:] + known[:-1]
+            )
+        for n_player, hand in enumerate(hands):
+            mask = to_mask(hand)
+            self.seen[n_player] |= mask
+            self.known[n_player][n_player] = mask
+
+    def unseen(self, n_player: int) -> int:
+        """Get the cards a player has never seen, in the other hands or the deck."""
+        return ALL_CARDS & ~(self.seen[n_player] | self.public)
+
+    def unseen_counts(self, n_player: int) -> dict[OColor, int]:
+        """Get the number of cards of each color a player has never seen."""
+        unseen = self.unseen(n_player)
+        return {
+            color: (unseen & mask).bit_count()
+            for color, mask in zip(COLORS, COLOR_MASKS)
+        }
+
+    def candidates(self, n_player: int, n_other: int) -> int:
+        """Get the cards that may be in the hand of a seat, as far as a player knows."""
+        known = self.known[n_player][n_other] & ~self.public
+        return known or self.unseen(n_player)
+
+    def sample(
+        self, n_player: int, rng: random.Random
+    ) -> tuple[list[list[OCard]], list[OCard]]:
+        """Draw hands and a deck consistent with what a player knows.
+
+        A hand the player has held this season is drawn among the cards it passed
+        on that were not placed since, the others and the deck among the cards it
+        has never seen.
+
+        Returns:
+            The hand of each player, the one of `n_player` being its own, and the
+            remaining deck.
+        """
+        public = self.public
+        pool = to_values(self.unseen(n_player))
+        rng.shuffle(pool)
+        hands = []
+        for n_other, known in enumerate(self.known[n_player]):
+            # the players know their own hand exactly
+            size = (self.known[n_other][n_other] & ~public).bit_count()
+            known &= ~public
+            if n_other == n_player:
+                values = to_values(known)
+            elif known:
+                values = rng.sample(to_values(known), size)
+            else:
+                values, pool = pool[:size], pool[size:]
+            hands.append([CARDS[value] for value in values])  # type: ignore[misc]
+        return hands, [CARDS[value] for value in pool[: self.deck]]  # type: ignore[misc]
@@ -0,0 +1,52 @@
+# type: ignore
+import argparse
+import sys
+import time
+
+from ohanami.players import AVAILABLE_PLAYERS
+from ohanami.selfplay import generate
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="selfplay")
+    parser.add_argument("directory", help="Directory of the data set, resumed if any.")
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Master seed, defaults to the one of the data set or a random one.",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend.__name__ for backend in AVAILABLE_PLAYERS],
+        default=None,
+        help="Backends seated at random, defaults to all the available ones.",
+    )
+    args = parser.parse_args(argv[1:])
+    backends = [
+        backend
+        for backend in AVAILABLE_PLAYERS
+        if args.backends is None or backend.__name__ in args.backends
+    ]
+
+    start = time.perf_counter()
+    samples = generate(
+        args.directory,
+        args.games,
+        args.players,
+        seed=args.seed,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        progress=lambda done, total: print(f"Shard {done}/{total}"),
+        backends=backends,
+    )
+    print(f"{samples} samples in {args.directory}, {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,13 +1,20 @@
 # type: ignore
 import argparse
+import json
+import random
 import sys
 
 import numpy as np
 
-from matplotlib import pyplot as plt
-
-from ohanami.game import OGame
+from ohanami.budget import OBudget
+from ohanami.duplicate import run_duplicate
+from ohanami.game import OGame, derive_seeds
+from ohanami.output import OBufferedOutput, OJsonOutput, OTableOutput
+from ohanami.profiling import OProfiler
 from ohanami.players import AVAILABLE_PLAYERS, OBackend
+from ohanami.rating import ORatings, run_rated
+from ohanami.stats import ORunningStats, OScoreStats
+from ohanami.tournament import run, run_remote
 
 
 def main(argv: list[str]) -> None:
@@ -15,15 +22,256 @@ def main(argv: list[str]) -> None:
     parser.add_argument("--turns", type=int, default=100)
     parser.add_argument("--sets-per-turn", type=int, default=10)
     parser.add_argument("--players", type=int, choices=[3, 4], default=4)
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Play all the games over worker processes, without plotting.",
+    )
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Play the games in this process without plotting, printing the statistics only.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Play all the games with the vectorized engine (implies --headless).",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend.__name__ for backend in AVAILABLE_PLAYERS],
+        default=None,
+        help="Backends seated at random, defaults to all the available ones.",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["table", "buffered", "json", "none"],
+        default="table",
+        help="How the games of non-headless tournaments are printed.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time the phases of the games and the moves of each backend.",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=None,
+        help="Dump the profiling report in this JSON file (implies --profile).",
+    )
+    parser.add_argument(
+        "--move-ms",
+        type=float,
+        default=None,
+        help="Time allowed per move, in milliseconds.",
+    )
+    parser.add_argument(
+        "--game-ms",
+        type=float,
+        default=None,
+        help="Time allowed per player over a game, in milliseconds.",
+    )
+    parser.add_argument(
+        "--fallback",
+        choices=[backend.__name__ for backend in AVAILABLE_PLAYERS],
+        default=None,
+        help="Backend playing the overrun moves, discarding two cards if not given.",
+    )
+    parser.add_argument(
+        "--isolation",
+        choices=["thread", "process"],
+        default="thread",
+        help="Where the moves run when limited in time.",
+    )
+    parser.add_argument(
+        "--rated",
+        action="store_true",
+        help="Rate the backends, playing the most informative matchups until they are ranked, instead of a fixed number of games.",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of the ratings of --rated tournaments.",
+    )
+    parser.add_argument(
+        "--max-games",
+        type=int,
+        default=100_000,
+        help="Number of games after which --rated tournaments stop anyway.",
+    )
+    parser.add_argument(
+        "--duplicate",
+        action="store_true",
+        help="Play each deal once per seat rotation of a lineup of the --backends, in the given order, and report their paired score differences.",
+    )
+    parser.add_argument(
+        "--deals",
+        type=int,
+        default=None,
+        help="Number of deals of --duplicate tournaments, defaults to the number of games divided by the number of players.",
+    )
+    parser.add_argument(
+        "--remote-workers",
+        type=int,
+        default=None,
+        help="Play --headless games in lockstep, their moves being served by this many backend processes.",
+    )
+    parser.add_argument(
+        "--lockstep",
+        action="store_true",
+        help="Play the games of each --headless shard in lockstep, batching the moves of each backend.",
+    )
+    parser.add_argument(
+        "--log-dir",
+        default=None,
+        help="Log the games of --headless tournaments in this directory.",
+    )
 
     tournament = parser.parse_args(argv[1:])
+    profile = tournament.profile or tournament.profile_output is not None
+    budget = (
+        None
+        if tournament.move_ms is None and tournament.game_ms is None
+        else OBudget(
+            tournament.move_ms,
+            tournament.game_ms,
+            next(
+                (
+                    backend
+                    for backend in AVAILABLE_PLAYERS
+                    if backend.__name__ == tournament.fallback
+                ),
+                None,
+            ),
+            tournament.isolation,
+        )
+    )
+    backends = [
+        backend
+        for backend in AVAILABLE_PLAYERS
+        if tournament.backends is None or backend.__name__ in tournament.backends
+    ]
     print(
         f"Starting tounament with {tournament.turns} turns, {tournament.sets_per_turn} sets per turns."
     )
 
-    scores: dict[type[OBackend], list[int]] = {
-        backend: [] for backend in AVAILABLE_PLAYERS
-    }
+    if tournament.batch:
+        from ohanami.batch import BATCH_POLICIES
+
+        backends = [backend for backend in backends if backend in BATCH_POLICIES]
+
+    if tournament.duplicate:
+        names = tournament.backends or [backend.__name__ for backend in backends]
+        by_name = {backend.__name__: backend for backend in backends}
+        lineup = [
+            by_name[names[seat % len(names)]] for seat in range(tournament.players)
+        ]
+        results = run_duplicate(
+            tournament.deals
+            or tournament.turns * tournament.sets_per_turn // tournament.players,
+            lineup,
+            seed=tournament.seed,
+            workers=tournament.workers,
+            progress=lambda done, total: print(f"Shard {done}/{total}"),
+        )
+        print(results.format())
+        return
+
+    if tournament.rated:
+        ratings, stats = run_rated(
+            tournament.players,
+            backends,
+            seed=tournament.seed,
+            confidence=tournament.confidence,
+            max_games=tournament.max_games,
+            progress=lambda played, ratings: print(f"Game {played}"),
+        )
+        print_stats(stats, backends)
+        print_ratings(ratings)
+        return
+
+    if tournament.headless and tournament.remote_workers is not None:
+        stats = run_remote(
+            tournament.turns * tournament.sets_per_turn,
+            tournament.players,
+            seed=tournament.seed,
+            workers=tournament.remote_workers,
+            shard_size=tournament.shard_size,
+            progress=lambda done, total: print(f"Shard {done}/{total}"),
+            backends=backends,
+        )
+        print_stats(stats, backends)
+        return
+
+    if tournament.headless or tournament.batch:
+        stats = run(
+            tournament.turns * tournament.sets_per_turn,
+            tournament.players,
+            seed=tournament.seed,
+            workers=tournament.workers,
+            shard_size=tournament.shard_size,
+            batch=tournament.batch,
+            progress=lambda done, total: print(f"Shard {done}/{total}"),
+            backends=backends,
+            log_dir=tournament.log_dir,
+            profile=profile,
+            budget=budget,
+            lockstep=tournament.lockstep,
+        )
+        print_stats(stats, backends)
+        print_profile(stats, tournament.profile_output)
+        return
+
+    stats = OScoreStats(profiler=OProfiler() if profile else None)
+    plots = None if tournament.no_plot else create_plots(backends)
+
+    seed = (
+        random.SystemRandom().getrandbits(64)
+        if tournament.seed is None
+        else tournament.seed
+    )
+    output = {
+        "table": OTableOutput,
+        "buffered": OBufferedOutput,
+        "json": lambda: OJsonOutput(sys.stdout),
+        "none": lambda: None,
+    }[tournament.output]()
+    for turn, game_seed in enumerate(derive_seeds(seed, tournament.turns)):
+        print(f"Turn {turn+1}/{tournament.turns}")
+        game = OGame.create(
+            [None for i in range(tournament.players)],
+            seed=game_seed,
+            available=backends,
+        )
+        game.output = output
+        game.profiler = stats.profiler
+        game.budget = budget
+        for _ in range(tournament.sets_per_turn):
+            game.reset()
+            game.start()
+            stats.add_game(game)
+        game.close()
+        if output is not None:
+            output.flush()
+        if plots is not None:
+            update_plots(plots, stats)
+    if budget is not None:
+        stats.overruns = budget.overruns
+    print_stats(stats, backends)
+    print_profile(stats, tournament.profile_output)
+    if plots is not None:
+        input("hit enter")
+
+
+def create_plots(backends: list[type[OBackend]]) -> dict:
+    """Create the figure of the score distributions, with a line per backend."""
+    # matplotlib is slow to import, and only needed when plotting
+    from matplotlib import pyplot as plt
 
     NPOINTS = 100
     plt.ion()
@@ -36,35 +284,59 @@ def main(argv: list[str]) -> None:
             np.linspace(0, 0, NPOINTS),
             label=backend.__name__,
         )[0]
-        for backend in AVAILABLE_PLAYERS
+        for backend in backends
     }
     ax.legend(loc="upper left")
     plt.plot()
     plt.pause(0.01)
+    return plots
 
-    for turn in range(tournament.turns):
-        print(f"Turn {turn+1}/{tournament.turns}")
-        game = OGame.create([None for i in range(tournament.players)])
-        for _ in range(tournament.sets_per_turn):
-            game.reset()
-            game.start()
-            for player in game.players:
-                scores[player.backend.__class__].append(player.score)
-        for backend, score in scores.items():
-            xs, ys = get_distribution(score)
-            plots[backend].set_data(xs, ys / max(0.0001, ys.max()))
-        plt.draw()
-        plt.pause(0.01)
-    print(scores)
-    input("hit enter")
+
+def update_plots(plots: dict, stats: OScoreStats) -> None:
+    from matplotlib import pyplot as plt
+
+    for backend, backend_stats in stats.backends.items():
+        xs, ys = get_distribution(backend_stats)
+        plots[backend].set_data(xs, ys / max(0.0001, ys.max()))
+    plt.draw()
+    plt.pause(0.01)
+
+
+def print_stats(stats: OScoreStats, backends: list[type[OBackend]]) -> None:
+    for backend in backends:
+        backend_stats = stats[backend]
+        print(
+            f"{backend.__name__}: {backend_stats.mean:.2f} +- {backend_stats.std:.2f} ({backend_stats.count} scores)"
+        )
+    for backend, overruns in stats.overruns.items():
+        print(
+            f"{backend.__name__}: {overruns.timeouts} timeouts and {overruns.exhausted} exhausted budgets and {overruns.blocked} blocked moves over {overruns.moves} moves"
+        )
+
+
+def print_ratings(ratings: ORatings) -> None:
+    for backend in ratings.ranking():
+        rating = ratings[backend]
+        print(
+            f"{backend.__name__}: rated {rating.mu:.2f} +- {rating.sigma:.2f} ({rating.games} games)"
+        )
+
+
+def print_profile(stats: OScoreStats, path: str | None) -> None:
+    if stats.profiler is None:
+        return
+    print(stats.profiler.format())
+    if path is not None:
+        with open(path, "w") as file:
+            json.dump(stats.profiler.report(), file, indent=2)
 
 
 def get_distribution(
-    scores: list[int], npoints=100, sigma_limit=5
+    stats: ORunningStats, npoints=100, sigma_limit=5
 ) -> tuple[np.ndarray[float], np.ndarray[float]]:
-    """Get the equivalent normal distribution from a series of scores."""
-    mean = np.mean(scores)
-    dev = np.std(scores)
+    """Get the equivalent normal distribution from running score statistics."""
+    mean = stats.mean
+    dev = stats.std
     xs = np.linspace(mean - 5 * dev, mean + 5 * dev, npoints)
     ys = np.e ** (-((xs - mean) ** 2) / dev**2) / (dev * np.sqrt(2 * np.pi))
     return xs, ys
@@ -0,0 +1,24 @@
+from ohanami.batch import OPolicyBackend, random_retard
+from ohanami.game import OGame, derive_seeds, play_games
+
+
+class VectorRandom(OPolicyBackend):
+    policy = staticmethod(random_retard)
+
+
+def create_game(seed: int) -> OGame:
+    game = OGame.create([VectorRandom() for _ in range(3)], seed=seed)
+    game.output = None
+    game.history = []
+    return game
+
+
+def test_random_policy_moves_only_depend_on_their_game():
+    seeds = derive_seeds(2, 6)
+    alone = create_game(seeds[0])
+    play_games([alone])
+    batch = [create_game(seed) for seed in reversed(seeds)]
+    play_games(batch)
+    sequential = create_game(seeds[0])
+    sequential.start()
+    assert batch[-1].history == alone.history == sequential.history
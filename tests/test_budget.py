@@ -0,0 +1,78 @@
+import threading
+import time
+
+from ohanami.budget import OBudget
+from ohanami.game import OGame
+from ohanami.players import Centrist
+
+# Set by the hanging backend once it has changed its views after the deadline
+changed = threading.Event()
+
+
+class Hanging(Centrist):
+    """Overruns every move, then changes its hand, piles and generator."""
+
+    noob = True
+
+    def play(self, cards, piles, game):
+        time.sleep(0.05)
+        for pile in piles:
+            pile.add(cards[0], backend=self)
+        cards.clear()
+        game.rng.random()
+        changed.set()
+        return super().play(cards, piles, game)
+
+
+class Waiting(Centrist):
+    """Plays as Centrist once the hanging move has changed its views."""
+
+    def play(self, cards, piles, game):
+        changed.wait(1)
+        changed.clear()
+        return super().play(cards, piles, game)
+
+
+class Sleeping(Centrist):
+    """Overruns every move by far."""
+
+    def play(self, cards, piles, game):
+        time.sleep(0.2)
+        return super().play(cards, piles, game)
+
+
+def create_game(backends: list, budget: OBudget | None = None) -> OGame:
+    game = OGame.create(backends, seed=3, shuffle=False)
+    game.output = None
+    game.budget = budget
+    game.start()
+    return game
+
+
+def play(backends: list, budget: OBudget | None = None) -> list[int]:
+    return [player.score for player in create_game(backends, budget).players]
+
+
+def test_timed_out_thread_does_not_change_the_fallback_move():
+    budget = OBudget(move_ms=10, fallback=Waiting)
+    game = create_game([Hanging(), Centrist(), Centrist()], budget)
+    assert budget.overruns[Hanging].timeouts == 15
+    assert [player.score for player in game.players] == play(
+        [Centrist(), Centrist(), Centrist()]
+    )
+    # the abandoned moves draw from generators of their own
+    in_time = create_game([Centrist(), Centrist(), Centrist()], OBudget(move_ms=1000))
+    assert game.rng.getstate() == in_time.rng.getstate()
+
+
+def test_timed_out_threads_exit():
+    running = threading.active_count()
+    budget = OBudget(move_ms=5, max_detached=2)
+    play([Sleeping(), Centrist(), Centrist()], budget)
+    overruns = budget.overruns[Sleeping]
+    assert overruns.timeouts + overruns.blocked == 15
+    assert overruns.blocked > 0
+    assert threading.active_count() <= running + 3
+    budget.close()
+    time.sleep(0.5)
+    assert threading.active_count() == running
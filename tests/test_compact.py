@@ -0,0 +1,14 @@
+from ohanami.compact import CompactGame
+from ohanami.players import (
+    AVAILABLE_PLAYERS,
+    Centrist,
+    EndgameSolver,
+)
+
+
+def test_plays_every_backend():
+    for backend in AVAILABLE_PLAYERS + [EndgameSolver]:
+        game = CompactGame.create([backend(), Centrist(), Centrist()], seed=1)
+        game.output = None
+        game.start()
+        assert game.finished
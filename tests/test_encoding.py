@@ -0,0 +1,36 @@
+from ohanami.encoding import FEATURES, encode
+from ohanami.game import OGame
+from ohanami.players import Centrist
+
+
+def test_tracked_games_encode_the_hands_held_earlier():
+    game = OGame.create([Centrist() for _ in range(3)], seed=4, track=True)
+    game.output = None
+    game.deal_cards()
+    first_hand = list(game.players[0].hand)
+    game.turn()
+    seen = encode([game], [0])[0, FEATURES["seen"]]
+    # the first hand was passed on, minus the two cards played from it
+    assert all(seen[card.value - 1] for card in first_hand)
+    untracked = game.clone()
+    untracked.tracker = None
+    assert encode([untracked], [0])[0, FEATURES["seen"]].sum() < seen.sum()
+
+
+def test_untracked_games_encode_the_cards_of_the_piles():
+    game = OGame.create([Centrist() for _ in range(4)], seed=5)
+    game.output = None
+    game.deal_cards()
+    for _ in range(7):
+        game.turn()
+    observations = encode([game, game], [0, 2])
+    for observation, seat in zip(observations, [0, 2]):
+        player = game.players[seat]
+        values = {card.value for card in player.hand + player.discarded_cards}
+        for other in game.players:
+            for pile in other.piles:
+                values.update(card.value for card in pile.cards)
+        seen = observation[FEATURES["seen"]]
+        assert set(seen.nonzero()[0] + 1) == values
+        hand = observation[FEATURES["hand"]]
+        assert set(hand.nonzero()[0] + 1) == {card.value for card in player.hand}
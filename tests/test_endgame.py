@@ -0,0 +1,51 @@
+import pickle
+
+from ohanami.game import (
+    OGame,
+    derive_seeds,
+)
+from ohanami.players import Centrist, EndgameSolver
+
+
+def create_game(seed: int) -> OGame:
+    game = OGame.create([Centrist(), Centrist(), Centrist()], seed=seed, shuffle=False)
+    game.output = None
+    game.deal_cards()
+    # the solver only searches the last turns of the third season
+    for _ in range(13):
+        game.turn()
+    game.begin_turn()
+    game.current_seat = 0
+    return game
+
+
+def test_ignores_the_hidden_hands():
+    for seed in range(20):
+        game = create_game(seed)
+        copy = pickle.loads(pickle.dumps(game))
+        # cards the player has never seen, swapped between the hands and the deck
+        for n_other, other in enumerate(copy.players[1:]):
+            deck = copy.remaining_deck
+            start, end = 4 * n_other, 4 * n_other + 4
+            other.hand, deck[start:end] = deck[start:end], other.hand
+        moves = []
+        for played in (game, copy):
+            player = played.players[0]
+            moves.append(EndgameSolver().play(list(player.hand), player.piles, played))
+        assert moves[0] == moves[1]
+
+
+def play(backends: list, seed: int) -> int:
+    game = OGame.create(backends, seed=seed, shuffle=False)
+    game.output = None
+    game.start()
+    return game.players[-1].score
+
+
+def test_gains_over_the_fallback():
+    gain = 0
+    for seed in derive_seeds(0, 20):
+        opponents = [Centrist(), Centrist()]
+        gain += play(opponents + [EndgameSolver()], seed)
+        gain -= play(opponents + [Centrist()], seed)
+    assert gain >= 0
@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+
+from ohanami.game import OGame, derive_seeds
+from ohanami.gamelog import OGameLogReader, OGameLogWriter
+from ohanami.players import AVAILABLE_PLAYERS, AlwaysSmall, BetterBeSafe, Centrist
+
+
+def write_log(path: str) -> list[OGame]:
+    games = []
+    with OGameLogWriter(path, 3, AVAILABLE_PLAYERS) as log:
+        for seed in derive_seeds(4, 10):
+            game = OGame.create([Centrist(), AlwaysSmall(), BetterBeSafe()], seed)
+            game.output = None
+            game.history = []
+            game.start()
+            log.write(game)
+            games.append(game)
+    return games
+
+
+def test_scores_by_chunks(tmp_path):
+    path = os.path.join(tmp_path, "games.ohlog")
+    games = write_log(path)
+    reader = OGameLogReader(path)
+    boards = reader.scoreboards()
+    assert [len(chunk) for chunk in reader.iter_scoreboards(4)] == [4, 4, 2]
+    assert np.array_equal(np.concatenate(list(reader.iter_scoreboards(4))), boards)
+    out = np.lib.format.open_memmap(
+        os.path.join(tmp_path, "boards.npy"), "w+", np.int32, boards.shape
+    )
+    assert reader.scoreboards(3, out=out) is out
+    assert np.array_equal(out, boards)
+    assert reader.scores(3).tolist() == [
+        [player.score for player in game.players] for game in games
+    ]
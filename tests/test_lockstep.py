@@ -0,0 +1,70 @@
+import gc
+import os
+
+import pytest
+
+from ohanami.game import OGame, derive_seeds, play_games
+from ohanami.gamelog import OGameLogReader, OGameLogWriter
+from ohanami.players import AVAILABLE_PLAYERS, AlwaysSmall, Centrist
+from ohanami.tournament import play_shard
+
+
+class Batched(AlwaysSmall):
+    """Plays as AlwaysSmall in batches, keeping the seats its games tell."""
+
+    seats: list[int | None] = []
+
+    def play_batch(self, hands, piles, games):
+        self.seats += [game.current_seat for game in games]
+        return super().play_batch(hands, piles, games)
+
+
+def test_logged_lockstep_games_score_as_played(tmp_path):
+    games = []
+    for seed in derive_seeds(1, 20):
+        game = OGame.create(
+            [Centrist(), AlwaysSmall(), Centrist(), AlwaysSmall()], seed
+        )
+        game.output = None
+        game.history = []
+        games.append(game)
+    play_games(games)
+    path = os.path.join(tmp_path, "games.ohlog")
+    with OGameLogWriter(path, 4, AVAILABLE_PLAYERS) as log:
+        for game in games:
+            log.write(game)
+    assert OGameLogReader(path).scores().tolist() == [
+        [player.score for player in game.players] for game in games
+    ]
+
+
+def test_lockstep_shard_logs_score_as_played(tmp_path):
+    backends = [
+        backend for backend in AVAILABLE_PLAYERS if backend.__name__ != "MonteCarlo"
+    ]
+    stats = play_shard(
+        7, 0, 40, 3, backends=backends, log_dir=str(tmp_path), lockstep=True
+    )
+    reader = OGameLogReader(os.path.join(tmp_path, "shard-0.ohlog"))
+    totals: dict[tuple[str, int], list[int]] = {}
+    for (_, names, _), scores in zip(reader, reader.scores().tolist()):
+        for seat, (name, score) in enumerate(zip(names, scores)):
+            totals.setdefault((name, seat), []).append(score)
+    for (backend, seat), seat_stats in stats.seats.items():
+        scores = totals.pop((backend.__name__, seat))
+        assert seat_stats.count == len(scores)
+        assert seat_stats.mean == pytest.approx(sum(scores) / len(scores))
+    assert not totals
+
+
+def test_batches_are_not_told_a_seat():
+    games = []
+    for seed in derive_seeds(2, 5):
+        game = OGame.create([Centrist(), Batched(), Centrist()], seed, shuffle=False)
+        game.output = None
+        games.append(game)
+    frozen = gc.get_freeze_count()
+    play_games(games)
+    assert gc.get_freeze_count() == frozen
+    assert len(Batched.seats) == 75
+    assert set(Batched.seats) == {None}
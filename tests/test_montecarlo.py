@@ -0,0 +1,35 @@
+import multiprocessing
+import pickle
+
+from ohanami.game import OGame
+from ohanami.players import Centrist, MonteCarlo
+
+
+def create_game(backends: list, seed: int = 1) -> OGame:
+    game = OGame.create(backends, seed=seed, shuffle=False)
+    game.output = None
+    return game
+
+
+def test_close_shuts_down_workers():
+    backend = MonteCarlo(rollouts=4, workers=2)
+    game = create_game([backend, Centrist(), Centrist()])
+    game.start()
+    assert multiprocessing.active_children()
+    game.close()
+    assert backend._executor is None
+    assert not multiprocessing.active_children()
+
+
+def test_plays_on_a_copy_of_the_game():
+    backend = MonteCarlo(rollouts=4)
+    game = create_game([Centrist(), backend, Centrist()])
+    game.deal_cards()
+    game.begin_turn()
+    game.current_seat = 1
+    # as in worker processes, the players of the copy hold copies of the backend
+    copy = pickle.loads(pickle.dumps(game))
+    player = copy.players[1]
+    cards, piles = list(player.hand), player.piles
+    (_, first), (_, second) = backend.play(cards, piles, copy)
+    assert {first.value, second.value} <= {card.value for card in cards}
@@ -0,0 +1,37 @@
+import pytest
+
+from ohanami.game import OGame
+from ohanami.players import AlwaysSmall, BetterBeSafe, Centrist, RandomRetardPlayer
+from ohanami.rating import ORating, ORatings, best_matchup
+
+
+def finished_game(backends: list, scores: list[int]) -> OGame:
+    game = OGame.create([backend() for backend in backends], shuffle=False)
+    for player, score in zip(game.players, scores):
+        player.total_score = score
+    return game
+
+
+def test_multiplayer_games_count_once_per_player():
+    backends = [RandomRetardPlayer, AlwaysSmall, BetterBeSafe, Centrist]
+    two_players = ORatings()
+    two_players.add_game(finished_game(backends[:2], [1, 2]))
+    four_players = ORatings()
+    four_players.add_game(finished_game(backends, [1, 2, 3, 4]))
+    # the winner beats three players, each pair bringing a third of a game
+    assert four_players[Centrist].sigma == pytest.approx(
+        two_players[AlwaysSmall].sigma, rel=0.02
+    )
+
+
+def test_matchup_focuses_on_overlapping_backends_filling_the_seats():
+    ratings = ORatings(
+        ratings={
+            RandomRetardPlayer: ORating(mu=10, sigma=1),
+            AlwaysSmall: ORating(mu=40, sigma=1),
+            BetterBeSafe: ORating(mu=25, sigma=8),
+            Centrist: ORating(mu=26, sigma=8),
+        }
+    )
+    matchup = best_matchup(ratings, list(ratings.ratings), 4, 2.0)
+    assert set(matchup) == {BetterBeSafe, Centrist}